@@ -3,10 +3,11 @@
 LangExtract日本語テキスト解析のクイックテスト
 青空文庫から小説を取得してLangExtractで解析する
 """
-import sys
+import argparse
+from concurrent.futures import ThreadPoolExecutor
 from src.aozora_fetcher import AozoraFetcher
 from src.text_extractor import JapaneseTextExtractor
-from src.result_analyzer import ResultVisualizer, ResultAnalyzer
+from src.result_analyzer import ResultVisualizer
 
 
 def quick_analyze(work_name: str = "羅生門", save_results: bool = True, model_id: str = None):
@@ -34,9 +35,9 @@ def quick_analyze(work_name: str = "羅生門", save_results: bool = True, model
         
         # 2. LangExtract実行
         print("\n🤖 LangExtractで情報抽出中...")
-        extractor = JapaneseTextExtractor(model_id=model_id)
-        
-        results = extractor.extract_all(text)
+        # model_idがNoneの場合は、.envの読み込み後に環境変数LANGEXTRACT_MODELから決定される
+        with JapaneseTextExtractor(model_id=model_id) as extractor:
+            results = extractor.extract_all(text)
         
         # 3. 結果表示
         visualizer = ResultVisualizer(results, text)
@@ -44,13 +45,20 @@ def quick_analyze(work_name: str = "羅生門", save_results: bool = True, model
         
         # 4. 結果保存
         if save_results:
-            # JSON/CSV保存（作品ごとのディレクトリに保存）
-            analyzer = ResultAnalyzer(results)
-            output_path = analyzer.save_results(work_name=work_name)
-            
-            # HTMLレポート生成（作品ごとのディレクトリに保存）
+            # JSON/CSV保存とHTMLレポート生成はどちらもディスクI/Oのみなので並行して実行する
             html_filename = "report.html"
-            html_file = visualizer.generate_html_report(work_name=work_name, filename=html_filename)
+            with ThreadPoolExecutor(max_workers=2) as executor:
+                # JSON/CSV保存（作品ごとのディレクトリに保存）
+                # 表示時に集計済みの統計を再利用するため、visualizerのanalyzerで保存する
+                save_future = executor.submit(visualizer.analyzer.save_results, work_name=work_name)
+                
+                # HTMLレポート生成（作品ごとのディレクトリに保存）
+                html_future = executor.submit(
+                    visualizer.generate_html_report, work_name=work_name, filename=html_filename
+                )
+                
+                output_path = save_future.result()
+                html_future.result()
         
         print("\n✅ 解析完了!")
         
@@ -72,33 +80,24 @@ def main():
     works = ["羅生門", "坊っちゃん", "走れメロス", "銀河鉄道の夜"]
     
     # コマンドライン引数の処理
-    work_name = "羅生門"  # デフォルト
-    model_id = None  # デフォルト（環境変数から取得）
-    
-    # モデル指定の処理
-    if "--model" in sys.argv:
-        try:
-            model_index = sys.argv.index("--model")
-            if model_index + 1 < len(sys.argv):
-                model_id = sys.argv[model_index + 1]
-                print(f"🔧 指定されたモデル: {model_id}")
-            else:
-                print("⚠️  --modelオプションにはモデル名が必要です")
-                sys.exit(1)
-        except ValueError:
-            pass
+    parser = argparse.ArgumentParser(
+        description="青空文庫の作品をLangExtractで解析します",
+        epilog="使用例: uv run python quick_test.py 羅生門 --model gpt-4o",
+    )
+    parser.add_argument(
+        "work_name", nargs="?", default="羅生門", choices=works,
+        help="解析する作品名（デフォルト: 羅生門）",
+    )
+    parser.add_argument(
+        "--model", dest="model_id", default=None, metavar="MODEL",
+        help="使用するLLMモデル（省略時は環境変数LANGEXTRACT_MODELから取得）",
+    )
+    args = parser.parse_args()
     
-    # 作品名の処理（--modelオプション以外の引数から）
-    for arg in sys.argv[1:]:
-        if not arg.startswith("--") and arg not in [model_id]:
-            if arg in works:
-                work_name = arg
-                break
-            else:
-                print(f"⚠️  指定された作品が見つかりません: {arg}")
-                print(f"利用可能な作品: {', '.join(works)}")
-                print(f"使用例: uv run python quick_test.py 羅生門 --model gpt-4o")
-                sys.exit(1)
+    work_name = args.work_name
+    model_id = args.model_id
+    if model_id:
+        print(f"🔧 指定されたモデル: {model_id}")
     
     # 解析実行
     success = quick_analyze(work_name, model_id=model_id)
@@ -1,9 +1,46 @@
 """
 青空文庫からテキストを取得・前処理するモジュール
 """
+import asyncio
+import hashlib
 import re
+import tempfile
+from pathlib import Path
+from typing import TYPE_CHECKING
 import requests
-from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+
+# BeautifulSoup・aiohttpは取得処理でしか使わないので、起動時間短縮のため使用箇所で遅延インポートする
+if TYPE_CHECKING:
+    import aiohttp
+
+# ルビを親文字に置き換えるための正規表現
+#   グループ1: ｜漢字《かんじ》
+#   グループ2: 漢字《かんじ》（｜なし）
+_RUBY_RE = re.compile(
+    r'｜([^《]+)《[^》]+》'
+    r'|([一-龥々ぁ-ゔァ-ヴー]+)《[^》]+》'
+)
+
+# 注釈を除去するための正規表現（［＃...］形式・※［＃...］形式。ルビ関連の注記を含む）
+# ルビの親文字に含まれる注釈も除去できるよう、ルビの置き換え後に別の走査で適用する
+_ANNOTATION_RE = re.compile(r'※?［＃[^］]+］')
+
+# 過剰な空行（3行以上の連続改行）を検出する正規表現
+_RE_NL3 = re.compile(r'\n{3,}')
+
+
+def _replace_ruby(match: re.Match) -> str:
+    """ルビを親文字に置き換える"""
+    return match.group(1) or match.group(2)
+
+
+def _collapse_repeats(text: str, char: str) -> str:
+    """同じ文字の連続を1文字にまとめる（str.replaceのみで処理し、連続長に対して対数回で収束）"""
+    doubled = char * 2
+    while doubled in text:
+        text = text.replace(doubled, char)
+    return text
 
 
 class AozoraFetcher:
@@ -29,16 +66,36 @@ class AozoraFetcher:
         }
     }
     
+    def __init__(self, cache_dir: str | None = ".cache/aozora"):
+        """
+        初期化
+        同一ホスト（青空文庫）への接続を使い回すため、セッションを保持する
+        Args:
+            cache_dir: 正規化済みテキストのキャッシュ先（Noneの場合はキャッシュしない）
+        """
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=8)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+    
     def fetch_sample(self, work_name: str) -> str:
         """サンプル作品を取得"""
         if work_name not in self.SAMPLE_WORKS:
             raise ValueError(f"作品名が見つかりません: {work_name}")
         
         work_info = self.SAMPLE_WORKS[work_name]
+        
+        cached_text = self._read_cache(work_info['url'])
+        if cached_text is not None:
+            print(f"📦 {work_name}（{work_info['author']}）をキャッシュから読み込みました: {len(cached_text)}文字")
+            return cached_text
+        
         print(f"📚 {work_name}（{work_info['author']}）を取得中...")
         
         text = self.fetch_from_url(work_info['url'])
         normalized_text = self.normalize_text(text)
+        self._write_cache(work_info['url'], normalized_text)
         
         print(f"✅ 取得完了: {len(normalized_text)}文字")
         return normalized_text
@@ -46,25 +103,11 @@ class AozoraFetcher:
     def fetch_from_url(self, url: str) -> str:
         """指定URLからテキストを取得"""
         try:
-            response = requests.get(url, timeout=30)
-            response.encoding = 'shift_jis'  # 青空文庫の文字コード
-            
-            # HTMLからテキスト部分を抽出
-            soup = BeautifulSoup(response.content, 'html.parser', from_encoding='shift_jis')
-            
-            # 本文を含むdivを探す
-            main_text = soup.find('div', class_='main_text')
-            if not main_text:
-                # 古い形式の場合、bodyから直接取得
-                main_text = soup.body
-                if not main_text:
-                    # さらに古い形式の場合、全体から取得
-                    main_text = soup
-            
-            # テキスト抽出
-            text = main_text.get_text()
+            response = self.session.get(url, timeout=30)
+            # エラーページを本文として正規化・キャッシュしないよう、2xx以外は例外にする
+            response.raise_for_status()
             
-            return text
+            return self._extract_main_text(response.content)
             
         except Exception as e:
             print(f"❌ エラー: {e}")
@@ -72,6 +115,101 @@ class AozoraFetcher:
             # エラー時のフォールバック
             return ""
     
+    async def fetch_many(self, work_names: list[str]) -> list[str]:
+        """複数のサンプル作品を並行して取得（作品名の順で正規化済みテキストを返す）"""
+        for work_name in work_names:
+            if work_name not in self.SAMPLE_WORKS:
+                raise ValueError(f"作品名が見つかりません: {work_name}")
+        
+        # キャッシュ済みの作品はネットワークアクセスを省略する
+        urls = [self.SAMPLE_WORKS[work_name]['url'] for work_name in work_names]
+        normalized_texts = [self._read_cache(url) for url in urls]
+        missing = [i for i, text in enumerate(normalized_texts) if text is None]
+        if not missing:
+            print(f"📦 {len(work_names)}作品をキャッシュから読み込みました")
+            return normalized_texts
+        
+        print(f"📚 {len(missing)}作品を並行して取得中...")
+        
+        import aiohttp
+        
+        async with aiohttp.ClientSession() as session:
+            texts = await asyncio.gather(*[
+                self.afetch_from_url(session, urls[i]) for i in missing
+            ])
+        
+        for i, text in zip(missing, texts):
+            normalized_texts[i] = self.normalize_text(text)
+            self._write_cache(urls[i], normalized_texts[i])
+            print(f"✅ 取得完了: {work_names[i]} {len(normalized_texts[i])}文字")
+        return normalized_texts
+    
+    async def afetch_from_url(self, session: "aiohttp.ClientSession", url: str) -> str:
+        """指定URLからテキストを非同期で取得"""
+        import aiohttp
+        
+        try:
+            timeout = aiohttp.ClientTimeout(total=30)
+            async with session.get(url, timeout=timeout) as response:
+                response.raise_for_status()
+                content = await response.read()
+            
+            return self._extract_main_text(content)
+            
+        except Exception as e:
+            print(f"❌ エラー: {url}: {e}")
+            # エラー時のフォールバック
+            return ""
+    
+    def _extract_main_text(self, content: bytes) -> str:
+        """HTML（Shift_JIS）から本文テキストを抽出"""
+        from bs4 import BeautifulSoup
+        
+        # 青空文庫の文字コード（Shift_JIS）で一度だけデコードする
+        html = content.decode('shift_jis', errors='replace')
+        soup = BeautifulSoup(html, 'lxml')
+        
+        # 本文を含むdivを探す
+        main_text = soup.find('div', class_='main_text')
+        if not main_text:
+            # 古い形式の場合、bodyから直接取得
+            main_text = soup.body
+            if not main_text:
+                # さらに古い形式の場合、全体から取得
+                main_text = soup
+        
+        # テキスト抽出
+        return main_text.get_text()
+    
+    def _cache_path(self, url: str) -> Path:
+        """
+        URLに対応するキャッシュファイルのパス
+        正規化処理を変更した際に古い結果を使わないよう、正規化のバージョンをキーに含める
+        """
+        key = hashlib.sha1(f"{TextNormalizer.VERSION}:{url}".encode('utf-8')).hexdigest()
+        return self.cache_dir / f"{key}.txt"
+    
+    def _read_cache(self, url: str) -> str | None:
+        """キャッシュ済みの正規化テキストを読み込む（未キャッシュの場合はNone）"""
+        if self.cache_dir is None:
+            return None
+        cache_path = self._cache_path(url)
+        if not cache_path.exists():
+            return None
+        return cache_path.read_text(encoding='utf-8')
+    
+    def _write_cache(self, url: str, text: str):
+        """正規化テキストをキャッシュに保存（取得失敗時の空テキストは保存しない）"""
+        if self.cache_dir is None or not text:
+            return
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        # 書き込み途中のファイルを読まないよう、一時ファイルに書いてから置き換える
+        with tempfile.NamedTemporaryFile(
+            'w', encoding='utf-8', dir=self.cache_dir, suffix='.tmp', delete=False
+        ) as f:
+            f.write(text)
+        Path(f.name).replace(self._cache_path(url))
+    
     def normalize_text(self, text: str) -> str:
         """テキストの正規化（ルビ・注釈の除去）"""
         normalizer = TextNormalizer()
@@ -81,68 +219,49 @@ class AozoraFetcher:
 class TextNormalizer:
     """青空文庫形式のテキスト正規化クラス"""
     
-    # ルビのパターン
-    RUBY_PATTERNS = [
-        # パターン1: ｜漢字《かんじ》
-        (r'｜([^《]+)《[^》]+》', r'\1'),
-        # パターン2: 漢字《かんじ》（｜なし）
-        (r'([一-龥々ぁ-ゔァ-ヴー]+)《[^》]+》', r'\1'),
-        # パターン3: ［＃ルビ関連］
-        (r'［＃[^］]*ルビ[^］]*］', ''),
-    ]
-    
-    # 注釈のパターン
-    ANNOTATION_PATTERNS = [
-        # ［＃...］形式の注釈
-        (r'［＃[^］]+］', ''),
-        # ※［＃...］形式
-        (r'※［＃[^］]+］', ''),
-    ]
+    # 正規化処理のバージョン（処理を変更したら上げて、ディスクキャッシュを無効にする）
+    VERSION = 1
+    
+    # 一般的な本文開始・終了パターン
+    HEADER_MARKERS = ('-------', '【テキスト中に現れる記号について】')
+    FOOTER_MARKERS = ('底本：', '入力：', '校正：', '※［＃')
     
     def normalize(self, text: str) -> str:
         """テキストを正規化"""
-        # 1. ルビの除去
-        for pattern, replacement in self.RUBY_PATTERNS:
-            text = re.sub(pattern, replacement, text)
+        # 1. ルビ・注釈の除去
+        text = _RUBY_RE.sub(_replace_ruby, text)
+        text = _ANNOTATION_RE.sub('', text)
         
-        # 2. 注釈の除去
-        for pattern, replacement in self.ANNOTATION_PATTERNS:
-            text = re.sub(pattern, replacement, text)
+        # 2. 改行・空白の正規化（1文字単位の置換はstr.replaceの方が正規表現より速い）
+        text = text.replace('\r\n', '\n')       # 改行コード統一
+        text = _collapse_repeats(text, '　')     # 全角スペース重複除去
+        text = _RE_NL3.sub('\n\n', text)         # 過剰な空行を削除
+        text = _collapse_repeats(text, ' ')      # 半角スペース重複除去
         
-        # 3. 改行・空白の正規化
-        text = re.sub(r'\r\n', '\n', text)  # 改行コード統一
-        text = re.sub(r'　+', '　', text)   # 全角スペース重複除去
-        text = re.sub(r'\n\n\n+', '\n\n', text)  # 過剰な空行を削除
-        text = re.sub(r' +', ' ', text)     # 半角スペース重複除去
-        
-        # 4. ヘッダー・フッターの除去
+        # 3. ヘッダー・フッターの除去
         text = self._remove_headers_footers(text)
         
         return text.strip()
     
     def _remove_headers_footers(self, text: str) -> str:
-        """作品本文以外の部分を除去"""
-        lines = text.split('\n')
-        
-        # 本文開始位置を探す
-        start_idx = 0
-        for i, line in enumerate(lines):
-            # 一般的な本文開始パターン
-            if any(marker in line for marker in ['-------', '【テキスト中に現れる記号について】']):
-                start_idx = i + 1
-                break
-        
-        # 本文終了位置を探す
-        end_idx = len(lines)
-        for i in range(len(lines) - 1, -1, -1):
-            line = lines[i]
-            # 一般的な本文終了パターン
-            if any(marker in line for marker in ['底本：', '入力：', '校正：', '※［＃']):
-                end_idx = i
-                break
+        """作品本文以外の部分を除去（行リストを作らずに切り出し位置を求める）"""
+        # 本文開始位置を探す: 開始マーカーを含む最初の行の次の行から
+        start = 0
+        start_positions = [
+            pos for pos in (text.find(marker) for marker in self.HEADER_MARKERS) if pos != -1
+        ]
+        if start_positions:
+            line_end = text.find('\n', min(start_positions))
+            start = len(text) if line_end == -1 else line_end + 1
+        
+        # 本文終了位置を探す: 終了マーカーを含む最後の行の直前の改行まで
+        end = len(text)
+        end_pos = max(text.rfind(marker) for marker in self.FOOTER_MARKERS)
+        if end_pos != -1:
+            end = max(text.rfind('\n', 0, end_pos), 0)
         
         # 本文部分のみを返す
-        return '\n'.join(lines[start_idx:end_idx])
+        return text[start:end]
 
 
 if __name__ == "__main__":
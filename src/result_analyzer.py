@@ -1,11 +1,139 @@
 """
 抽出結果の分析と可視化を行うモジュール
 """
-import json
+import csv
+import re
 from typing import Dict, List, Any
 from pathlib import Path
 from collections import Counter
-import pandas as pd
+import orjson
+
+# 日本語特有の分析で使うマーカー（モジュール読み込み時に一度だけ構築）
+_FIRST_PERSON_RE = re.compile(
+    "|".join(map(re.escape, ["私", "僕", "俺", "わたし", "わたくし", "あたし"]))
+)
+_INDIRECT_RE = re.compile("そうだ|らしい|ようだ|みたい")
+_FORMAL_SET = frozenset(["上司部下", "師弟", "先輩後輩"])
+
+# HTMLレポートのテンプレート（モジュール読み込み時に一度だけ構築）
+# CSSを含む先頭部分は差し込み箇所がないため、format不要な固定文字列として持つ
+_HTML_HEAD = """
+<!DOCTYPE html>
+<html lang="ja">
+<head>
+    <meta charset="utf-8">
+    <title>LangExtract 日本語解析結果</title>
+    <style>
+        body {
+            font-family: 'Hiragino Sans', 'Meiryo', sans-serif;
+            line-height: 1.6;
+            max-width: 1200px;
+            margin: 0 auto;
+            padding: 20px;
+            background-color: #f5f5f5;
+        }
+        .container {
+            background-color: white;
+            padding: 30px;
+            border-radius: 10px;
+            box-shadow: 0 2px 10px rgba(0,0,0,0.1);
+        }
+        h1 {
+            color: #333;
+            border-bottom: 3px solid #4CAF50;
+            padding-bottom: 10px;
+        }
+        h2 {
+            color: #4CAF50;
+            margin-top: 30px;
+        }
+        .character {
+            background-color: #e3f2fd;
+            padding: 10px;
+            margin: 10px 0;
+            border-radius: 5px;
+        }
+        .emotion {
+            background-color: #fff3e0;
+            padding: 10px;
+            margin: 10px 0;
+            border-radius: 5px;
+        }
+        .relationship {
+            background-color: #f3e5f5;
+            padding: 10px;
+            margin: 10px 0;
+            border-radius: 5px;
+        }
+        .stats {
+            display: grid;
+            grid-template-columns: repeat(auto-fit, minmax(200px, 1fr));
+            gap: 20px;
+            margin: 20px 0;
+        }
+        .stat-card {
+            background-color: #f0f0f0;
+            padding: 15px;
+            border-radius: 5px;
+            text-align: center;
+        }
+        .stat-number {
+            font-size: 2em;
+            font-weight: bold;
+            color: #4CAF50;
+        }
+        .quote {
+            font-style: italic;
+            color: #666;
+            padding-left: 20px;
+            border-left: 3px solid #ddd;
+        }
+    </style>
+</head>
+<body>
+    <div class="container">
+        <h1>📊 LangExtract 日本語テキスト解析結果</h1>
+        
+"""
+
+_HTML_STATS_TEMPLATE = """        <h2>📈 統計サマリー</h2>
+        <div class="stats">
+            <div class="stat-card">
+                <div class="stat-number">{total_characters}</div>
+                <div>登場人物数</div>
+            </div>
+            <div class="stat-card">
+                <div class="stat-number">{total_emotions}</div>
+                <div>感情表現数</div>
+            </div>
+            <div class="stat-card">
+                <div class="stat-number">{total_relationships}</div>
+                <div>関係性数</div>
+            </div>
+            <div class="stat-card">
+                <div class="stat-number">{characters_with_emotions}</div>
+                <div>感情を持つ人物数</div>
+            </div>
+        </div>
+        
+        <h2>👤 登場人物</h2>
+        """
+
+_HTML_EMOTIONS_HEADING = """
+        
+        <h2>💭 感情分析</h2>
+        """
+
+_HTML_RELATIONSHIPS_HEADING = """
+        
+        <h2>🔗 人物関係</h2>
+        """
+
+_HTML_FOOTER = """
+    </div>
+</body>
+</html>
+"""
 
 
 class ResultAnalyzer:
@@ -21,33 +149,52 @@ class ResultAnalyzer:
         self.characters = results.get("characters", [])
         self.emotions = results.get("emotions", [])
         self.relationships = results.get("relationships", [])
+        
+        # 集計結果のキャッシュ（初回呼び出し時に計算）
+        self._summary_stats = None
+        self._japanese_analysis = None
     
     def get_summary_stats(self) -> Dict[str, Any]:
-        """抽出結果の統計サマリーを取得"""
-        # 感情の種類別カウント
-        emotion_counts = Counter(e.emotion_type for e in self.emotions)
-        
-        # 性別の分布
-        gender_counts = Counter(c.gender for c in self.characters)
+        """抽出結果の統計サマリーを取得（結果はインスタンス内でキャッシュ）"""
+        if self._summary_stats is not None:
+            return self._summary_stats
+        
+        # 感情の種類別カウントと感情を持つ人物（1回の走査で集計）
+        emotion_counts = Counter()
+        emotion_subjects = set()
+        for e in self.emotions:
+            emotion_counts[e.emotion_type] += 1
+            emotion_subjects.add(e.subject)
+        
+        # 性別の分布とユニークな人物名（1回の走査で集計）
+        gender_counts = Counter()
+        unique_names = set()
+        for c in self.characters:
+            gender_counts[c.gender] += 1
+            unique_names.add(c.name)
         
         # 関係性の種類別カウント
         relation_counts = Counter(r.relation_type for r in self.relationships)
         
         stats = {
             "total_characters": len(self.characters),
-            "unique_names": len(set(c.name for c in self.characters)),
+            "unique_names": len(unique_names),
             "total_emotions": len(self.emotions),
             "emotion_types": dict(emotion_counts),
             "total_relationships": len(self.relationships),
             "relation_types": dict(relation_counts),
             "gender_distribution": dict(gender_counts),
-            "characters_with_emotions": len(set(e.subject for e in self.emotions))
+            "characters_with_emotions": len(emotion_subjects)
         }
         
+        self._summary_stats = stats
         return stats
     
     def analyze_japanese_specific(self) -> Dict[str, Any]:
-        """日本語特有の分析"""
+        """日本語特有の分析（結果はインスタンス内でキャッシュ）"""
+        if self._japanese_analysis is not None:
+            return self._japanese_analysis
+        
         analysis = {
             "first_person_pronouns": [],
             "indirect_emotions": [],
@@ -55,15 +202,13 @@ class ResultAnalyzer:
         }
         
         # 一人称の抽出
-        first_person = ["私", "僕", "俺", "わたし", "わたくし", "あたし"]
         for char in self.characters:
-            if any(pronoun in char.name for pronoun in first_person):
+            if _FIRST_PERSON_RE.search(char.name) is not None:
                 analysis["first_person_pronouns"].append(char.name)
         
         # 間接的な感情表現
-        indirect_markers = ["そうだ", "らしい", "ようだ", "みたい"]
         for emotion in self.emotions:
-            if any(marker in emotion.quote for marker in indirect_markers):
+            if _INDIRECT_RE.search(emotion.quote) is not None:
                 analysis["indirect_emotions"].append({
                     "subject": emotion.subject,
                     "emotion": emotion.emotion_type,
@@ -71,14 +216,14 @@ class ResultAnalyzer:
                 })
         
         # 敬語を含む関係性
-        formal_relations = ["上司部下", "師弟", "先輩後輩"]
         for rel in self.relationships:
-            if rel.relation_type in formal_relations:
+            if rel.relation_type in _FORMAL_SET:
                 analysis["formal_relationships"].append({
                     "persons": f"{rel.person1} - {rel.person2}",
                     "type": rel.relation_type
                 })
         
+        self._japanese_analysis = analysis
         return analysis
     
     def save_results(self, work_name: str = "unknown", output_dir: str = "data/results"):
@@ -98,27 +243,29 @@ class ResultAnalyzer:
             "japanese_analysis": self.analyze_japanese_specific()
         }
         
-        with open(work_output_path / "extraction_results.json", "w", encoding="utf-8") as f:
-            json.dump(results_dict, f, ensure_ascii=False, indent=2)
+        # キーに None などの非文字列が混ざっても保存できるよう OPT_NON_STR_KEYS を指定
+        (work_output_path / "extraction_results.json").write_bytes(
+            orjson.dumps(results_dict, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+        )
         
         # CSV形式でも保存
-        if self.characters:
-            pd.DataFrame([c.to_dict() for c in self.characters]).to_csv(
-                work_output_path / "characters.csv", index=False, encoding="utf-8"
-            )
-        
-        if self.emotions:
-            pd.DataFrame([e.to_dict() for e in self.emotions]).to_csv(
-                work_output_path / "emotions.csv", index=False, encoding="utf-8"
-            )
-        
-        if self.relationships:
-            pd.DataFrame([r.to_dict() for r in self.relationships]).to_csv(
-                work_output_path / "relationships.csv", index=False, encoding="utf-8"
-            )
+        self._write_csv(work_output_path / "characters.csv", self.characters)
+        self._write_csv(work_output_path / "emotions.csv", self.emotions)
+        self._write_csv(work_output_path / "relationships.csv", self.relationships)
         
         print(f"📁 結果を保存しました: {work_output_path}")
         return work_output_path
+    
+    def _write_csv(self, path: Path, items: List):
+        """データクラスのリストをCSVに書き出す（空の場合は何もしない）"""
+        if not items:
+            return
+        
+        rows = [item.to_dict() for item in items]
+        with open(path, "w", encoding="utf-8", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=list(rows[0].keys()), lineterminator="\n")
+            writer.writeheader()
+            writer.writerows(rows)
 
 
 class ResultVisualizer:
@@ -134,179 +281,83 @@ class ResultVisualizer:
         self.results = results
         self.original_text = original_text
         self.analyzer = ResultAnalyzer(results)
+        
+        # CLI表示（上位3件）とHTMLレポート（上位10件）で共有する代表的な感情表現
+        self._top_emotions = results.get("emotions", [])[:10]
     
     def display_results_cli(self):
-        """コマンドライン用の結果表示"""
+        """コマンドライン用の結果表示（出力をまとめて一度に書き出す）"""
         results = self.results
         stats = self.analyzer.get_summary_stats()
+        lines = []
         
-        print("\n" + "="*60)
-        print("📊 LangExtract 日本語テキスト解析結果")
-        print("="*60)
+        lines.append("\n" + "="*60)
+        lines.append("📊 LangExtract 日本語テキスト解析結果")
+        lines.append("="*60)
         
         # 登場人物
-        print("\n👤 登場人物:")
+        lines.append("\n👤 登場人物:")
         for char in results["characters"]:
-            print(f"  • {char.name}")
+            lines.append(f"  • {char.name}")
             if char.gender != "不明":
-                print(f"    性別: {char.gender}")
+                lines.append(f"    性別: {char.gender}")
             if char.age:
-                print(f"    年齢: {char.age}")
+                lines.append(f"    年齢: {char.age}")
             if char.occupation:
-                print(f"    職業: {char.occupation}")
+                lines.append(f"    職業: {char.occupation}")
             if char.personality:
-                print(f"    性格: {char.personality}")
-            print()
+                lines.append(f"    性格: {char.personality}")
+            lines.append("")
         
         # 感情分析
-        print("\n💭 感情分析:")
+        lines.append("\n💭 感情分析:")
         emotion_types = stats["emotion_types"]
         for emotion_type, count in sorted(emotion_types.items(), key=lambda x: x[1], reverse=True):
-            print(f"  • {emotion_type}: {count}回")
+            lines.append(f"  • {emotion_type}: {count}回")
         
         # 代表的な感情表現
-        if results["emotions"]:
-            print("\n  代表的な感情表現:")
-            for i, emotion in enumerate(results["emotions"][:3]):
-                print(f"  {i+1}. {emotion.subject}の{emotion.emotion_type}")
-                print(f"     「{emotion.quote}」")
+        if self._top_emotions:
+            lines.append("\n  代表的な感情表現:")
+            for i, emotion in enumerate(self._top_emotions[:3]):
+                lines.append(f"  {i+1}. {emotion.subject}の{emotion.emotion_type}")
+                lines.append(f"     「{emotion.quote}」")
         
         # 関係性
-        print("\n🔗 人物関係:")
+        lines.append("\n🔗 人物関係:")
         for rel in results["relationships"]:
             arrow = "↔" if rel.direction == "双方向" else "→"
-            print(f"  • {rel.person1} {arrow} {rel.person2}: {rel.relation_type}")
+            lines.append(f"  • {rel.person1} {arrow} {rel.person2}: {rel.relation_type}")
             if rel.evidence:
-                print(f"    根拠: 「{rel.evidence[:50]}...」")
+                lines.append(f"    根拠: 「{rel.evidence[:50]}...」")
         
         # 統計サマリー
-        print("\n📈 統計サマリー:")
-        print(f"  • 登場人物数: {stats['total_characters']}人")
-        print(f"  • 感情表現数: {stats['total_emotions']}個")
-        print(f"  • 関係性数: {stats['total_relationships']}個")
-        print(f"  • 感情を持つ人物数: {stats['characters_with_emotions']}人")
+        lines.append("\n📈 統計サマリー:")
+        lines.append(f"  • 登場人物数: {stats['total_characters']}人")
+        lines.append(f"  • 感情表現数: {stats['total_emotions']}個")
+        lines.append(f"  • 関係性数: {stats['total_relationships']}個")
+        lines.append(f"  • 感情を持つ人物数: {stats['characters_with_emotions']}人")
         
         # 日本語特有の分析
         jp_analysis = self.analyzer.analyze_japanese_specific()
         if jp_analysis["first_person_pronouns"]:
-            print(f"\n🗾 日本語特有の要素:")
-            print(f"  • 一人称: {', '.join(jp_analysis['first_person_pronouns'])}")
+            lines.append(f"\n🗾 日本語特有の要素:")
+            lines.append(f"  • 一人称: {', '.join(jp_analysis['first_person_pronouns'])}")
         
-        print("\n" + "="*60)
+        lines.append("\n" + "="*60)
+        print("\n".join(lines))
     
     def generate_html_report(self, work_name: str = "unknown", output_dir: str = "data/results", filename: str = "report.html"):
         """HTMLレポートを生成"""
         stats = self.analyzer.get_summary_stats()
         
-        html_content = f"""
-<!DOCTYPE html>
-<html lang="ja">
-<head>
-    <meta charset="utf-8">
-    <title>LangExtract 日本語解析結果</title>
-    <style>
-        body {{
-            font-family: 'Hiragino Sans', 'Meiryo', sans-serif;
-            line-height: 1.6;
-            max-width: 1200px;
-            margin: 0 auto;
-            padding: 20px;
-            background-color: #f5f5f5;
-        }}
-        .container {{
-            background-color: white;
-            padding: 30px;
-            border-radius: 10px;
-            box-shadow: 0 2px 10px rgba(0,0,0,0.1);
-        }}
-        h1 {{
-            color: #333;
-            border-bottom: 3px solid #4CAF50;
-            padding-bottom: 10px;
-        }}
-        h2 {{
-            color: #4CAF50;
-            margin-top: 30px;
-        }}
-        .character {{
-            background-color: #e3f2fd;
-            padding: 10px;
-            margin: 10px 0;
-            border-radius: 5px;
-        }}
-        .emotion {{
-            background-color: #fff3e0;
-            padding: 10px;
-            margin: 10px 0;
-            border-radius: 5px;
-        }}
-        .relationship {{
-            background-color: #f3e5f5;
-            padding: 10px;
-            margin: 10px 0;
-            border-radius: 5px;
-        }}
-        .stats {{
-            display: grid;
-            grid-template-columns: repeat(auto-fit, minmax(200px, 1fr));
-            gap: 20px;
-            margin: 20px 0;
-        }}
-        .stat-card {{
-            background-color: #f0f0f0;
-            padding: 15px;
-            border-radius: 5px;
-            text-align: center;
-        }}
-        .stat-number {{
-            font-size: 2em;
-            font-weight: bold;
-            color: #4CAF50;
-        }}
-        .quote {{
-            font-style: italic;
-            color: #666;
-            padding-left: 20px;
-            border-left: 3px solid #ddd;
-        }}
-    </style>
-</head>
-<body>
-    <div class="container">
-        <h1>📊 LangExtract 日本語テキスト解析結果</h1>
-        
-        <h2>📈 統計サマリー</h2>
-        <div class="stats">
-            <div class="stat-card">
-                <div class="stat-number">{stats['total_characters']}</div>
-                <div>登場人物数</div>
-            </div>
-            <div class="stat-card">
-                <div class="stat-number">{stats['total_emotions']}</div>
-                <div>感情表現数</div>
-            </div>
-            <div class="stat-card">
-                <div class="stat-number">{stats['total_relationships']}</div>
-                <div>関係性数</div>
-            </div>
-            <div class="stat-card">
-                <div class="stat-number">{stats['characters_with_emotions']}</div>
-                <div>感情を持つ人物数</div>
-            </div>
-        </div>
-        
-        <h2>👤 登場人物</h2>
-        {"".join(self._format_character_html(char) for char in self.results['characters'])}
-        
-        <h2>💭 感情分析</h2>
-        {"".join(self._format_emotion_html(emotion) for emotion in self.results['emotions'][:10])}
-        
-        <h2>🔗 人物関係</h2>
-        {"".join(self._format_relationship_html(rel) for rel in self.results['relationships'])}
-    </div>
-</body>
-</html>
-"""
+        # HTML断片をリストに集め、最後に一度だけ結合する
+        parts = [_HTML_HEAD, _HTML_STATS_TEMPLATE.format(**stats)]
+        parts.extend(self._format_character_html(char) for char in self.results['characters'])
+        parts.append(_HTML_EMOTIONS_HEADING)
+        parts.extend(self._format_emotion_html(emotion) for emotion in self._top_emotions)
+        parts.append(_HTML_RELATIONSHIPS_HEADING)
+        parts.extend(self._format_relationship_html(rel) for rel in self.results['relationships'])
+        parts.append(_HTML_FOOTER)
         
         # 作品ごとのディレクトリを作成
         safe_work_name = work_name.replace(" ", "_").replace("/", "_")
@@ -315,8 +366,7 @@ class ResultVisualizer:
         
         # HTMLファイルを作成
         html_file = work_output_path / filename
-        with open(html_file, 'w', encoding='utf-8') as f:
-            f.write(html_content)
+        html_file.write_text("".join(parts), encoding='utf-8')
         
         print(f"📄 HTMLレポートを生成しました: {html_file}")
         return html_file
@@ -1,16 +1,119 @@
 """
 LangExtractを使用して日本語テキストから情報を抽出するモジュール
 """
-from typing import List, Dict, Optional
-from dataclasses import dataclass, asdict
+import asyncio
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Any, AsyncIterator, Callable, Hashable, Iterable, List, Dict, Optional, Tuple
+from collections import OrderedDict
+from dataclasses import dataclass, fields, replace
 from enum import Enum
+from functools import lru_cache
 import re
-import time
-import langextract as lx
-from dotenv import load_dotenv
+import threading
+import weakref
+from aiolimiter import AsyncLimiter
+from tqdm import tqdm
+from tenacity import (
+    AsyncRetrying,
+    RetryCallState,
+    retry_if_exception,
+    stop_after_attempt,
+    wait_exponential_jitter,
+)
 
-# 環境変数の読み込み
-load_dotenv()
+logger = logging.getLogger(__name__)
+
+# langextractは依存ライブラリが多く読み込みに時間がかかるため、データクラスだけを使う場合に読み込まないよう
+# JapaneseTextExtractorの初期化時に読み込む（_load_dependencies）
+lx = None
+
+# LangExtractがモデル出力の解析に失敗した際に送出する例外（_load_dependenciesで設定）
+_PARSE_ERRORS: Tuple[type, ...] = ()
+
+# .envの読み込み済みフラグ（ディスクI/Oを伴うため、最初の初期化時に一度だけ読み込む）
+_dotenv_loaded = False
+
+# 文の区切り文字（チャンク化で使用）
+_SENTENCE_DELIM_RE = re.compile(r'[。！？\n]')
+
+# 名前の正規化用の変換テーブル（半角・全角スペースを除去）
+_NAME_TRANS = str.maketrans("", "", " 　")
+
+# 重複統合時に「情報なし」とみなす値
+_EMPTY_VALUES = (None, "", "不明")
+
+# 抽出結果のキャッシュ件数の上限
+_EXTRACT_CACHE_SIZE = 256
+
+# リトライ対象とするAPIのステータスコード（429: レート制限 / 504: タイムアウト）
+_RETRYABLE_STATUS_CODES = (429, 504)
+
+
+def _load_dependencies():
+    """langextractと環境変数（.env）を初回のみ読み込む"""
+    global lx, _dotenv_loaded, _PARSE_ERRORS
+    if lx is None:
+        import langextract
+        from langextract.core.exceptions import FormatParseError
+        from langextract.resolver import ResolverParsingError
+        lx = langextract
+        _PARSE_ERRORS = (ResolverParsingError, FormatParseError)
+    if not _dotenv_loaded:
+        from dotenv import load_dotenv
+        load_dotenv()
+        _dotenv_loaded = True
+
+
+@lru_cache(maxsize=4096)
+def _normalize_name(name: str) -> str:
+    """名前の正規化（空白除去・小文字化）。チャンク間で同じ名前が繰り返し現れるためキャッシュする"""
+    return name.translate(_NAME_TRANS).lower()
+
+
+def _character_key(char: "Character") -> str:
+    """登場人物の重複判定キー（正規化した名前）"""
+    return _normalize_name(char.name)
+
+
+def _relationship_key(rel: "Relationship") -> tuple:
+    """関係性の重複判定キー（人物の順序によらない組み合わせと関係の種類）"""
+    return (frozenset((rel.person1, rel.person2)), rel.relation_type)
+
+
+def _iter_error_chain(error: Optional[BaseException]):
+    """例外とその原因を順にたどる（LangExtractがラップしたプロバイダーSDKの例外を含む）"""
+    seen = set()
+    while error is not None and id(error) not in seen:
+        seen.add(id(error))
+        yield error
+        error = getattr(error, "original", None) or error.__cause__ or error.__context__
+
+
+def _is_retryable_error(error: BaseException) -> bool:
+    """
+    リトライすべき一時的なAPIエラー（レート制限・タイムアウト）かどうかを判定
+    エラーメッセージの文字列ではなく、SDKの例外が持つステータスコードで判定する
+      - google-genai: APIError.code / google-api-core: ResourceExhausted.code, DeadlineExceeded.code
+      - OpenAI: RateLimitError.status_code
+    """
+    for err in _iter_error_chain(error):
+        if isinstance(err, TimeoutError):
+            return True
+        status = getattr(err, "code", None) or getattr(err, "status_code", None)
+        if status in _RETRYABLE_STATUS_CODES:
+            return True
+    return False
+
+
+def _print_retry(retry_state: RetryCallState):
+    """一時的なAPIエラーによるリトライ待機を通知"""
+    logger.warning(
+        "⏱️ レート制限・タイムアウト: %.1f秒待機してリトライします（%d回目）: %s",
+        retry_state.next_action.sleep, retry_state.attempt_number, retry_state.outcome.exception()
+    )
 
 
 class Gender(Enum):
@@ -20,7 +123,7 @@ class Gender(Enum):
     UNKNOWN = "不明"
 
 
-@dataclass
+@dataclass(slots=True)
 class Character:
     """登場人物のデータクラス"""
     name: str
@@ -31,10 +134,17 @@ class Character:
     personality: Optional[str]
     
     def to_dict(self):
-        return asdict(self)
+        return {
+            "name": self.name,
+            "gender": self.gender,
+            "age": self.age,
+            "occupation": self.occupation,
+            "appearance": self.appearance,
+            "personality": self.personality
+        }
 
 
-@dataclass
+@dataclass(slots=True)
 class Emotion:
     """感情のデータクラス"""
     emotion_type: str
@@ -44,10 +154,16 @@ class Emotion:
     quote: str
     
     def to_dict(self):
-        return asdict(self)
+        return {
+            "emotion_type": self.emotion_type,
+            "subject": self.subject,
+            "target": self.target,
+            "intensity": self.intensity,
+            "quote": self.quote
+        }
 
 
-@dataclass
+@dataclass(slots=True)
 class Relationship:
     """関係性のデータクラス"""
     person1: str
@@ -57,19 +173,235 @@ class Relationship:
     evidence: str
     
     def to_dict(self):
-        return asdict(self)
+        return {
+            "person1": self.person1,
+            "person2": self.person2,
+            "relation_type": self.relation_type,
+            "direction": self.direction,
+            "evidence": self.evidence
+        }
+
+
+# プロンプトテンプレート（インスタンス間で共通の固定内容のため、モジュール読み込み時に一度だけ定義）
+_CHARACTER_PROMPT = """
+あなたは日本文学の専門家です。以下の小説から登場人物を抽出してください。
+
+抽出する情報:
+- name: 人物名（フルネーム、愛称、呼び名すべて）
+- gender: 性別（男性/女性/不明）
+- age: 年齢（明記されていれば数値、なければ推定：子供/若者/中年/老人）
+- occupation: 職業・身分
+- appearance: 外見的特徴
+- personality: 性格・人柄（具体的な描写から推測）
+
+注意事項:
+- 「私」「僕」などの一人称も人物として扱う
+- 同一人物の異なる呼び名は統合する
+- 推測の場合は必ず「推定」と明記する
+"""
+
+_EMOTION_PROMPT = """
+テキストから感情表現を抽出してください。
+
+抽出する情報:
+- emotion_type: 感情の種類（喜び、悲しみ、怒り、恐れ、驚き、嫌悪、期待、信頼など）
+- subject: 感情の主体（誰の感情か）
+- target: 感情の対象（何に対する感情か）
+- intensity: 感情の強度（弱い/普通/強い）
+- quote: 原文の該当箇所（正確に引用）
+
+日本語特有の表現に注意:
+- 間接的な感情表現（「〜そうだ」「〜らしい」）
+- 擬態語・擬音語による感情表現
+- 文末表現による感情のニュアンス
+"""
+
+_RELATIONSHIP_PROMPT = """
+登場人物間の関係性を抽出してください。
+
+抽出する情報:
+- person1: 人物1の名前
+- person2: 人物2の名前
+- relation_type: 関係の種類（家族/友人/恋人/上司部下/師弟/敵対など）
+- direction: 関係の方向性（一方向/双方向）
+- evidence: 関係性の根拠となる文章の引用
+
+関係性の種類の例:
+- 家族関係（親子、兄弟、夫婦など）
+- 社会的関係（上司部下、師弟、同僚など）
+- 個人的関係（友人、恋人、敵対など）
+"""
+
+_COMBINED_PROMPT = """
+あなたは日本文学の専門家です。以下の小説から登場人物・感情表現・人物間の関係性をまとめて抽出してください。
+抽出の種類はextraction_classで区別します。
+
+■ extraction_class: character（登場人物）
+- name: 人物名（フルネーム、愛称、呼び名すべて）
+- gender: 性別（男性/女性/不明）
+- age: 年齢（明記されていれば数値、なければ推定：子供/若者/中年/老人）
+- occupation: 職業・身分
+- appearance: 外見的特徴
+- personality: 性格・人柄（具体的な描写から推測）
+
+■ extraction_class: emotion（感情表現）
+- emotion_type: 感情の種類（喜び、悲しみ、怒り、恐れ、驚き、嫌悪、期待、信頼など）
+- subject: 感情の主体（誰の感情か）
+- target: 感情の対象（何に対する感情か）
+- intensity: 感情の強度（弱い/普通/強い）
+- quote: 原文の該当箇所（正確に引用）
+
+■ extraction_class: relationship（関係性）
+- person1: 人物1の名前
+- person2: 人物2の名前
+- relation_type: 関係の種類（家族/友人/恋人/上司部下/師弟/敵対など）
+- direction: 関係の方向性（一方向/双方向）
+- evidence: 関係性の根拠となる文章の引用
+
+注意事項:
+- 「私」「僕」などの一人称も人物として扱う
+- 同一人物の異なる呼び名は統合する
+- 推測の場合は必ず「推定」と明記する
+- 間接的な感情表現（「〜そうだ」「〜らしい」）や擬態語・擬音語、文末表現による感情のニュアンスにも注意する
+"""
+
+_PROMPTS = {
+    "character": _CHARACTER_PROMPT,
+    "emotion": _EMOTION_PROMPT,
+    "relationship": _RELATIONSHIP_PROMPT,
+    "combined": _COMBINED_PROMPT
+}
+
+
+@lru_cache(maxsize=1)
+def _build_examples() -> Dict[str, List]:
+    """抽出例を構築（初回のみ生成し、以降は同じオブジェクトを共有する）"""
+    character_examples = [
+        lx.data.ExampleData(
+            text="私は猫である。名前はまだ無い。",
+            extractions=[
+                lx.data.Extraction(
+                    extraction_class="character",
+                    extraction_text="私",
+                    attributes={
+                        "name": "私（猫）",
+                        "gender": "不明",
+                        "age": "不明",
+                        "occupation": "なし（猫）",
+                        "appearance": "猫",
+                        "personality": "観察力が鋭い、哲学的"
+                    }
+                )
+            ]
+        )
+    ]
+    emotion_examples = [
+        lx.data.ExampleData(
+            text="メロスは激怒した。必ず、かの邪智暴虐の王を除かなければならぬと決意した。",
+            extractions=[
+                lx.data.Extraction(
+                    extraction_class="emotion",
+                    extraction_text="メロスは激怒した",
+                    attributes={
+                        "emotion_type": "怒り",
+                        "subject": "メロス",
+                        "target": "王",
+                        "intensity": "強い"
+                    }
+                )
+            ]
+        )
+    ]
+    relationship_examples = [
+        lx.data.ExampleData(
+            text="メロスには妹がいる。十六歳で、村の牧人と婚約していた。",
+            extractions=[
+                lx.data.Extraction(
+                    extraction_class="relationship",
+                    extraction_text="メロスには妹がいる",
+                    attributes={
+                        "person1": "メロス",
+                        "person2": "妹",
+                        "relation_type": "兄妹",
+                        "direction": "双方向"
+                    }
+                )
+            ]
+        )
+    ]
+    return {
+        "character": character_examples,
+        "emotion": emotion_examples,
+        "relationship": relationship_examples,
+        "combined": character_examples + emotion_examples + relationship_examples
+    }
+
+
+class ExtractionMerger:
+    """
+    抽出結果を重複判定キーごとに逐次統合するクラス
+    結果とフィールド値ごとに出現順（バッチ番号, バッチ内の位置）を保持するため、
+    バッチの完了順に追加しても、チャンク順にまとめて統合した場合と同じ結果になる
+    """
+    
+    def __init__(self, key_func: Callable[[Any], Hashable]):
+        """
+        初期化
+        Args:
+            key_func: 抽出結果から重複判定キーを求める関数
+        """
+        self._key_func = key_func
+        # キー -> [最初に出現した結果の出現順, その結果, {フィールド名: (出現順, 値)}]
+        self._merged: Dict[Hashable, list] = {}
+        self._count = 0
+    
+    def add(self, item, order: Optional[Tuple[int, int]] = None):
+        """抽出結果を1件追加（orderを省略した場合は追加順）"""
+        if order is None:
+            order = (0, self._count)
+        self._count += 1
+        
+        key = self._key_func(item)
+        entry = self._merged.get(key)
+        if entry is None:
+            entry = self._merged[key] = [order, item, {}]
+        elif order < entry[0]:
+            entry[0], entry[1] = order, item
+        
+        # 情報ありのフィールドは、最も先に出現した値を採用する
+        field_values = entry[2]
+        for field in fields(item):
+            value = getattr(item, field.name)
+            if value in _EMPTY_VALUES:
+                continue
+            current = field_values.get(field.name)
+            if current is None or order < current[0]:
+                field_values[field.name] = (order, value)
+    
+    def add_all(self, items: Iterable, batch_index: Optional[int] = None):
+        """抽出結果をまとめて追加（batch_indexを指定した場合はバッチ内の位置を出現順とする）"""
+        for position, item in enumerate(items):
+            self.add(item, None if batch_index is None else (batch_index, position))
+    
+    def values(self) -> List:
+        """統合済みの抽出結果を出現順に返す"""
+        return [
+            replace(item, **{name: value for name, (_, value) in field_values.items()})
+            for _, item, field_values in sorted(self._merged.values(), key=lambda entry: entry[0])
+        ]
 
 
 class JapaneseTextExtractor:
     """日本語テキスト用のLangExtract実行クラス"""
     
-    def __init__(self, model_id: str = None):
+    def __init__(self, model_id: str = None, requests_per_minute: int = 15):
         """
         初期化
         Args:
             model_id: 使用するLLMモデル（Noneの場合は環境変数から取得）
+            requests_per_minute: 1分あたりのAPIリクエスト上限（Gemini無料枠は15）
         """
-        import os
+        _load_dependencies()
         
         # モデルIDの決定（優先順位: 引数 > 環境変数 > デフォルト）
         if model_id is None:
@@ -90,31 +422,109 @@ class JapaneseTextExtractor:
         
         print(f"🤖 使用モデル: {self.model_id}")
         
-        # プロンプトテンプレート
-        self.prompts = {
-            "character": self._get_character_prompt(),
-            "emotion": self._get_emotion_prompt(),
-            "relationship": self._get_relationship_prompt()
-        }
+        # APIレート制限（トークンバケット方式）
+        # AsyncLimiterはイベントループをまたいで使えないため、extract_allの実行（ループ）ごとに生成する
+        self.requests_per_minute = requests_per_minute
+        self._rate_limiters: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, AsyncLimiter]" = (
+            weakref.WeakKeyDictionary()
+        )
         
-        # 抽出例
-        self.examples = {
-            "character": self._get_character_examples(),
-            "emotion": self._get_emotion_examples(),
-            "relationship": self._get_relationship_examples()
-        }
+        # 抽出タイプごとのLLMモデル（HTTP接続を使い回すため、初回生成後は再利用する）
+        self._models: Dict[str, Any] = {}
+        self._models_lock = threading.Lock()
+        
+        # (抽出タイプ, テキストのハッシュ) -> 抽出結果 のLRUキャッシュ（再実行・フォールバック時の重複抽出を防ぐ）
+        self._extract_cache: "OrderedDict[Tuple[str, int], List]" = OrderedDict()
+        self._extract_cache_lock = threading.Lock()
+        
+        # プロンプトテンプレート・抽出例（モジュール共通の定義を参照）
+        self.prompts = _PROMPTS
+        self.examples = _build_examples()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+    
+    async def __aenter__(self):
+        return self
+    
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        self.close()
+    
+    def close(self):
+        """再利用しているLLMクライアントのHTTP接続を閉じる"""
+        with self._models_lock:
+            models = list(self._models.values())
+            self._models.clear()
+        for model in models:
+            client = getattr(model, "_client", None)
+            if hasattr(client, "close"):
+                client.close()
+    
+    def _get_rate_limiter(self) -> AsyncLimiter:
+        """実行中のイベントループ用のレートリミッターを取得"""
+        loop = asyncio.get_running_loop()
+        limiter = self._rate_limiters.get(loop)
+        if limiter is None:
+            limiter = self._rate_limiters[loop] = AsyncLimiter(self.requests_per_minute, 60)
+        return limiter
+    
+    def _get_model(self, extraction_type: str):
+        """
+        抽出タイプ用のLLMモデルを取得
+        lx.extractにmodel_idを渡すと呼び出しごとにAPIクライアントが生成されるため、
+        抽出例から作るスキーマ制約ごと生成済みのモデルを使い回してHTTP接続を再利用する
+        """
+        with self._models_lock:
+            model = self._models.get(extraction_type)
+            if model is None:
+                model = lx.factory.create_model(
+                    lx.factory.ModelConfig(
+                        model_id=self.model_id,
+                        provider_kwargs={"api_key": self.api_key}
+                    ),
+                    examples=self.examples[extraction_type],
+                    use_schema_constraints=True
+                )
+                self._models[extraction_type] = model
+            return model
     
     def extract_all(self, text: str, max_chunk_size: int = 3000, use_scaling: bool = True, 
-                   extraction_passes: int = 2, max_workers: int = 10, max_char_buffer: int = 1000) -> Dict[str, List]:
+                   extraction_passes: int = 2, max_workers: int = 10, max_char_buffer: int = 1000,
+                   batch_size: int = 4) -> Dict[str, List]:
+        """
+        すべての情報を抽出（extract_all_asyncの同期版ラッパー）
+        Args:
+            text: 入力テキスト
+            max_chunk_size: テキストチャンクの最大サイズ
+            use_scaling: LangExtractのscaling設定を使用するか
+            extraction_passes: 抽出パス数（複数回実行で精度向上）
+            max_workers: 並列処理ワーカー数（チャンク処理時の同時バッチ数。Scaling機能ではモデル側の並列数に従う）
+            max_char_buffer: コンテキストバッファサイズ
+            batch_size: チャンク処理時に1回のリクエストへまとめるチャンク数
+        Returns:
+            抽出結果の辞書
+        """
+        return asyncio.run(self.extract_all_async(
+            text, max_chunk_size, use_scaling, extraction_passes, max_workers, max_char_buffer, batch_size
+        ))
+    
+    async def extract_all_async(self, text: str, max_chunk_size: int = 3000, use_scaling: bool = True, 
+                                extraction_passes: int = 2, max_workers: int = 10, max_char_buffer: int = 1000,
+                                batch_size: int = 4) -> Dict[str, List]:
         """
         すべての情報を抽出（大容量テキスト対応・LangExtractのScaling to Longer Documents機能使用）
+        登場人物・感情・関係性の3種類の抽出は互いに独立しているため、並行して実行する
         Args:
             text: 入力テキスト
             max_chunk_size: テキストチャンクの最大サイズ
             use_scaling: LangExtractのscaling設定を使用するか
             extraction_passes: 抽出パス数（複数回実行で精度向上）
-            max_workers: 並列処理ワーカー数
+            max_workers: 並列処理ワーカー数（チャンク処理時の同時バッチ数。Scaling機能ではモデル側の並列数に従う）
             max_char_buffer: コンテキストバッファサイズ
+            batch_size: チャンク処理時に1回のリクエストへまとめるチャンク数
         Returns:
             抽出結果の辞書
         """
@@ -123,15 +533,20 @@ class JapaneseTextExtractor:
         # LangExtractのScaling機能を使用する場合
         if use_scaling and len(text) > max_chunk_size:
             print(f"🚀 LangExtractのScaling機能を使用して長文処理を実行します")
-            print(f"   抽出パス数: {extraction_passes}, 並列ワーカー: {max_workers}, バッファサイズ: {max_char_buffer}")
+            print(f"   抽出パス数: {extraction_passes}, バッファサイズ: {max_char_buffer}")
             
             try:
                 # Scaling機能を使用した抽出
-                results = {
-                    "characters": self._extract_with_scaling(text, "character", extraction_passes, max_workers, max_char_buffer),
-                    "emotions": self._extract_with_scaling(text, "emotion", extraction_passes, max_workers, max_char_buffer),
-                    "relationships": self._extract_with_scaling(text, "relationship", extraction_passes, max_workers, max_char_buffer)
-                }
+                # 1回の抽出の中でLangExtractが並列にリクエストするため、3種類は順番に実行し、
+                # レート制限・リトライを通して同時実行数が膨らまないようにする
+                # （失敗時に実行中のスレッドが取り残されることもない）
+                results = {}
+                for key, extraction_type in (("characters", "character"), ("emotions", "emotion"),
+                                             ("relationships", "relationship")):
+                    results[key] = await self._call_with_rate_limit(
+                        self._extract_with_scaling, text, extraction_type,
+                        extraction_passes, max_char_buffer
+                    )
                 
                 print("✅ Scaling機能による抽出完了!")
                 return results
@@ -142,202 +557,341 @@ class JapaneseTextExtractor:
         
         # テキストが長い場合はチャンク化（従来の方法）
         if len(text) > max_chunk_size:
-            print(f"📏 テキストが長いため、{max_chunk_size}文字ずつに分割して処理します")
-            chunks = self._chunk_text(text, max_chunk_size)
-            print(f"📝 {len(chunks)}個のチャンクに分割しました")
+            # バッチの完了ごとに重複統合を進め、全バッチ完了後の一括マージを不要にする
+            characters = ExtractionMerger(_character_key)
+            relationships = ExtractionMerger(_relationship_key)
+            emotions_by_batch = {}
+            async for i, kind, items in self.iter_extractions(text, max_chunk_size, max_workers, batch_size):
+                if kind == "characters":
+                    characters.add_all(items, i)
+                elif kind == "relationships":
+                    relationships.add_all(items, i)
+                else:
+                    emotions_by_batch[i] = items
             
-            # 各チャンクから抽出してマージ
-            all_characters = []
-            all_emotions = []
-            all_relationships = []
-            
-            for i, chunk in enumerate(chunks, 1):
-                print(f"  🔄 チャンク {i}/{len(chunks)} を処理中...")
-                try:
-                    chunk_results = {
-                        "characters": self._safe_extract_characters(chunk),
-                        "emotions": self._safe_extract_emotions(chunk),
-                        "relationships": self._safe_extract_relationships(chunk)
-                    }
-                    
-                    all_characters.extend(chunk_results["characters"])
-                    all_emotions.extend(chunk_results["emotions"])
-                    all_relationships.extend(chunk_results["relationships"])
-                    
-                    # チャンク間の待機時間（API制限対策）
-                    if i < len(chunks):
-                        print(f"    ⏳ API制限回避のため2秒待機中...")
-                        time.sleep(2)
-                    
-                except Exception as e:
-                    print(f"    ⚠️ チャンク{i}でエラー発生: {e}")
-                    # レート制限エラーの場合は長めに待機
-                    if "429" in str(e) or "RESOURCE_EXHAUSTED" in str(e):
-                        print(f"    ⏱️ レート制限エラー: 60秒待機してリトライします...")
-                        time.sleep(60)
-                        try:
-                            # リトライ
-                            chunk_results = {
-                                "characters": self._safe_extract_characters(chunk),
-                                "emotions": self._safe_extract_emotions(chunk), 
-                                "relationships": self._safe_extract_relationships(chunk)
-                            }
-                            all_characters.extend(chunk_results["characters"])
-                            all_emotions.extend(chunk_results["emotions"])
-                            all_relationships.extend(chunk_results["relationships"])
-                            print(f"    ✅ リトライ成功")
-                        except Exception as retry_e:
-                            print(f"    ❌ リトライも失敗: {retry_e}")
-                    continue
-            
-            # 重複除去
             results = {
-                "characters": self._deduplicate_characters(all_characters),
-                "emotions": all_emotions,  # 感情は重複があっても問題ない
-                "relationships": self._deduplicate_relationships(all_relationships)
+                "characters": characters.values(),
+                # 感情は重複があっても問題ない（チャンク順に並べる）
+                "emotions": [emotion for i in sorted(emotions_by_batch) for emotion in emotions_by_batch[i]],
+                "relationships": relationships.values()
             }
         else:
             # 通常処理
-            results = {
-                "characters": self._safe_extract_characters(text),
-                "emotions": self._safe_extract_emotions(text),
-                "relationships": self._safe_extract_relationships(text)
-            }
+            results = await self._extract_batch_async([text])
         
         print("✅ 抽出完了!")
         return results
     
+    async def iter_extractions(self, text: str, max_chunk_size: int = 3000, max_workers: int = 10,
+                               batch_size: int = 4) -> AsyncIterator[Tuple[int, str, List]]:
+        """
+        バッチごとの抽出結果を、処理が完了した順に返す非同期ジェネレータ
+        結果をすべてメモリに保持せず、呼び出し側で逐次書き出すために使用する
+        Args:
+            text: 入力テキスト
+            max_chunk_size: テキストチャンクの最大サイズ
+            max_workers: 同時に処理するバッチ数の上限
+            batch_size: 1回のリクエストへまとめるチャンク数
+        Yields:
+            (バッチ番号, 種類（characters/emotions/relationships）, 抽出結果のリスト)
+        """
+        if len(text) > max_chunk_size:
+            print(f"📏 テキストが長いため、{max_chunk_size}文字ずつに分割して処理します")
+            chunks = self._chunk_text(text, max_chunk_size)
+            print(f"📝 {len(chunks)}個のチャンクに分割しました")
+        else:
+            chunks = [text]
+        
+        # 複数チャンクを1回のリクエストにまとめ、プロンプト・抽出例の送信回数を減らす
+        batches = [chunks[i:i + batch_size] for i in range(0, len(chunks), batch_size)]
+        print(f"📦 {batch_size}チャンクずつ{len(batches)}個のバッチにまとめて処理します")
+        
+        # 各バッチを同時実行数を制限しつつ並行処理する（API制限はレートリミッターで制御）
+        semaphore = asyncio.Semaphore(max_workers)
+        
+        async def process_batch(i: int, batch: List[str]) -> Tuple[int, Dict[str, List]]:
+            async with semaphore:
+                try:
+                    return i, await self._extract_batch_async(batch)
+                except Exception as e:
+                    # リトライ上限に達したバッチは空の結果として扱い、他のバッチの処理は継続する
+                    logger.warning("❌ バッチ%dでエラー発生: %s", i, e)
+                    return i, {"characters": [], "emotions": [], "relationships": []}
+        
+        # 進捗はバッチの完了ごとに1本のプログレスバーで表示する
+        for next_result in tqdm(
+            asyncio.as_completed([process_batch(i, batch) for i, batch in enumerate(batches, 1)]),
+            total=len(batches), desc="🔄 バッチ処理", unit="バッチ"
+        ):
+            i, batch_results = await next_result
+            for kind, items in batch_results.items():
+                yield i, kind, items
+    
+    async def stream_to_jsonl(self, text: str, output_path: str, max_chunk_size: int = 3000,
+                              max_workers: int = 10, batch_size: int = 4) -> Path:
+        """
+        抽出結果をバッチの完了ごとにJSONLファイルへ書き出す
+        重複除去のために保持するのは登場人物・関係性のキーのみで、抽出結果自体は保持しない
+        Args:
+            text: 入力テキスト
+            output_path: 出力先のJSONLファイル（既存の場合は上書き）
+            max_chunk_size: テキストチャンクの最大サイズ
+            max_workers: 同時に処理するバッチ数の上限
+            batch_size: 1回のリクエストへまとめるチャンク数
+        Returns:
+            出力ファイルのパス
+        """
+        output_path = Path(output_path)
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        
+        # 重複判定に使うキー（感情は重複除去しない）
+        key_funcs = {"characters": _character_key, "relationships": _relationship_key}
+        seen_keys = {"characters": set(), "relationships": set()}
+        
+        with open(output_path, "w", encoding="utf-8") as f:
+            async for i, kind, items in self.iter_extractions(text, max_chunk_size, max_workers, batch_size):
+                for item in items:
+                    if kind in key_funcs:
+                        key = key_funcs[kind](item)
+                        if key in seen_keys[kind]:
+                            continue
+                        seen_keys[kind].add(key)
+                    record = {"batch": i, "type": kind, **item.to_dict()}
+                    f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        
+        print(f"💾 抽出結果を書き出しました: {output_path}")
+        return output_path
+    
+    async def _extract_batch_async(self, chunks: List[str]) -> Dict[str, List]:
+        """
+        複数チャンクをまとめたバッチから3種類の情報を1回のリクエストで抽出
+        JSON解析に失敗した場合はチャンクごとに種類別の抽出に戻す
+        """
+        try:
+            return await self._call_with_rate_limit(self._combined_extract, chunks)
+        except _PARSE_ERRORS:
+            logger.warning("⚠️ JSON解析エラー: チャンクごとに種類別の抽出でリトライします")
+            chunk_results = await asyncio.gather(*[
+                self._extract_separately_async(chunk) for chunk in chunks
+            ])
+            return {
+                key: [item for results in chunk_results for item in results[key]]
+                for key in ("characters", "emotions", "relationships")
+            }
+    
+    async def _extract_separately_async(self, text: str) -> Dict[str, List]:
+        """1つのテキストから3種類の情報を種類別のリクエストで並行して抽出"""
+        characters, emotions, relationships = await asyncio.gather(
+            self._async_extract("character", text),
+            self._async_extract("emotion", text),
+            self._async_extract("relationship", text)
+        )
+        return {
+            "characters": characters,
+            "emotions": emotions,
+            "relationships": relationships
+        }
+    
+    async def _call_with_rate_limit(self, func, *args):
+        """
+        ブロッキングな抽出処理をレート制限内でスレッド実行する
+        レート制限・タイムアウトの場合のみ、指数バックオフ（ジッター付き）で待機してリトライする
+        """
+        async for attempt in AsyncRetrying(
+            wait=wait_exponential_jitter(initial=1, max=60),
+            retry=retry_if_exception(_is_retryable_error),
+            stop=stop_after_attempt(5),
+            before_sleep=_print_retry,
+            reraise=True
+        ):
+            with attempt:
+                # 毎分のリクエスト数をトークンバケットで制限する（固定の待機時間は使わない）
+                async with self._get_rate_limiter():
+                    return await asyncio.to_thread(func, *args)
+    
+    async def _async_extract(self, extraction_type: str, text: str, split_on_parse_error: bool = True) -> List:
+        """
+        1種類の情報を抽出（エラーハンドリング付き）
+        lx.extractはブロッキングAPIのため、スレッドで実行して他の抽出と並行させる
+        解析エラー時の小さなチャンクでの再試行は1段階のみ行う（split_on_parse_error=Falseで無効）
+        """
+        try:
+            return await self._call_with_rate_limit(self._extract_items, extraction_type, text)
+        
+        except _PARSE_ERRORS:
+            logger.warning("⚠️ JSON解析エラー: テキストサイズを縮小してリトライします")
+            if not split_on_parse_error or len(text) <= 1000:
+                return []
+            # より小さなチャンクで再試行（最初の3チャンクのみ、並行して実行）
+            smaller_chunks = [
+                chunk for chunk in self._chunk_text(text, 1000)[:3] if len(chunk) < len(text)
+            ]
+            chunk_results = await asyncio.gather(*[
+                self._async_extract(extraction_type, chunk, split_on_parse_error=False)
+                for chunk in smaller_chunks
+            ], return_exceptions=True)
+            return [
+                item for items in chunk_results
+                if not isinstance(items, BaseException)
+                for item in items
+            ]
+        except Exception as e:
+            # レート制限・タイムアウト（リトライ上限到達）は呼び出し元へ送出する
+            if _is_retryable_error(e):
+                raise
+            logger.warning("❌ エラー: %s", e)
+            return []
+    
+    def _extract_items(self, extraction_type: str, text: str) -> List:
+        """1種類の情報を抽出してデータクラスのリストに変換"""
+        return self._convert_extractions(extraction_type, self._cached_extract(extraction_type, text))
+    
     def extract_characters(self, text: str) -> List[Character]:
         """登場人物を抽出"""
-        print("  👤 登場人物を抽出中...")
+        logger.debug("👤 登場人物を抽出中...")
         
         try:
-            result = lx.extract(
-                text_or_documents=text,
-                prompt_description=self.prompts["character"],
-                examples=self.examples["character"],
-                model_id=self.model_id,
-                api_key=self.api_key
-            )
-            
-            # 結果をCharacterオブジェクトに変換
-            characters = []
-            for extraction in result.extractions:
-                attrs = extraction.attributes
-                char = Character(
-                    name=extraction.extraction_text or attrs.get("name", "不明"),
-                    gender=attrs.get("gender", "不明"),
-                    age=attrs.get("age"),
-                    occupation=attrs.get("occupation"),
-                    appearance=attrs.get("appearance"),
-                    personality=attrs.get("personality")
-                )
-                characters.append(char)
-            
-            print(f"    → {len(characters)}人の登場人物を発見")
+            characters = self._extract_items("character", text)
+            logger.debug("→ %d人の登場人物を発見", len(characters))
             return characters
             
         except Exception as e:
-            print(f"    ❌ エラー: {e}")
+            logger.warning("❌ エラー: %s", e)
             return []
     
     def extract_emotions(self, text: str) -> List[Emotion]:
         """感情を抽出"""
-        print("  💭 感情を抽出中...")
+        logger.debug("💭 感情を抽出中...")
         
         try:
-            result = lx.extract(
-                text_or_documents=text,
-                prompt_description=self.prompts["emotion"],
-                examples=self.examples["emotion"],
-                model_id=self.model_id,
-                api_key=self.api_key
-            )
-            
-            emotions = []
-            for extraction in result.extractions:
-                attrs = extraction.attributes
-                emotion = Emotion(
-                    emotion_type=attrs.get("emotion_type", "不明"),
-                    subject=attrs.get("subject", "不明"),
-                    target=attrs.get("target"),
-                    intensity=attrs.get("intensity", "普通"),
-                    quote=extraction.extraction_text or attrs.get("quote", "")
-                )
-                emotions.append(emotion)
-            
-            print(f"    → {len(emotions)}個の感情を発見")
+            emotions = self._extract_items("emotion", text)
+            logger.debug("→ %d個の感情を発見", len(emotions))
             return emotions
             
         except Exception as e:
-            print(f"    ❌ エラー: {e}")
+            logger.warning("❌ エラー: %s", e)
             return []
     
     def extract_relationships(self, text: str) -> List[Relationship]:
         """関係性を抽出"""
-        print("  🔗 関係性を抽出中...")
+        logger.debug("🔗 関係性を抽出中...")
         
         try:
-            result = lx.extract(
-                text_or_documents=text,
-                prompt_description=self.prompts["relationship"],
-                examples=self.examples["relationship"],
-                model_id=self.model_id,
-                api_key=self.api_key
-            )
-            
-            relationships = []
-            for extraction in result.extractions:
-                attrs = extraction.attributes
-                rel = Relationship(
-                    person1=attrs.get("person1", "不明"),
-                    person2=attrs.get("person2", "不明"),
-                    relation_type=attrs.get("relation_type", "不明"),
-                    direction=attrs.get("direction", "一方向"),
-                    evidence=extraction.extraction_text or attrs.get("evidence", "")
-                )
-                relationships.append(rel)
-            
-            print(f"    → {len(relationships)}個の関係性を発見")
+            relationships = self._extract_items("relationship", text)
+            logger.debug("→ %d個の関係性を発見", len(relationships))
             return relationships
             
         except Exception as e:
-            print(f"    ❌ エラー: {e}")
+            logger.warning("❌ エラー: %s", e)
             return []
     
     def _chunk_text(self, text: str, max_size: int) -> List[str]:
-        """テキストを適切なサイズにチャンク化"""
+        """
+        テキストを適切なサイズにチャンク化（文字列の連結を繰り返さず、チャンク単位でjoinする）
+        文末に補う「。」を含めて、各チャンクがmax_size文字を超えないようにする
+        """
         chunks = []
-        sentences = re.split(r'[。！？\n]', text)
+        sentences = []  # 現在のチャンクに含める文
+        chunk_length = 0  # 現在のチャンクの文字数（文末の「。」を含む）
         
-        current_chunk = ""
-        for sentence in sentences:
-            if len(current_chunk) + len(sentence) <= max_size:
-                current_chunk += sentence + "。"
+        for sentence in _SENTENCE_DELIM_RE.split(text):
+            if not sentence.strip():
+                continue
+            # 1文だけでmax_sizeを超える場合は、「。」を補っても収まる長さに切り分ける
+            while len(sentence) + 1 > max_size and max_size > 1:
+                if sentences:
+                    chunks.append(("。".join(sentences) + "。").strip())
+                    sentences = []
+                    chunk_length = 0
+                chunks.append((sentence[:max_size - 1] + "。").strip())
+                sentence = sentence[max_size - 1:]
+            if chunk_length + len(sentence) + 1 <= max_size:
+                sentences.append(sentence)
+                chunk_length += len(sentence) + 1
             else:
-                if current_chunk:
-                    chunks.append(current_chunk.strip())
-                current_chunk = sentence + "。"
+                if sentences:
+                    chunks.append(("。".join(sentences) + "。").strip())
+                sentences = [sentence]
+                chunk_length = len(sentence) + 1
         
-        if current_chunk:
-            chunks.append(current_chunk.strip())
+        if sentences:
+            chunks.append(("。".join(sentences) + "。").strip())
         
         return chunks
     
-    def _safe_extract_characters(self, text: str) -> List[Character]:
-        """安全な登場人物抽出（エラーハンドリング付き）"""
-        try:
-            import json
-            result = lx.extract(
-                text_or_documents=text,
-                prompt_description=self.prompts["character"],
-                examples=self.examples["character"],
-                model_id=self.model_id,
-                api_key=self.api_key
-            )
-            
-            characters = []
-            for extraction in result.extractions:
+    def _deduplicate_characters(self, characters: Iterable[Character]) -> List[Character]:
+        """登場人物の重複除去（同名の人物は不明な属性を後から見つかった情報で補完する）"""
+        merger = ExtractionMerger(_character_key)
+        merger.add_all(characters)
+        return merger.values()
+    
+    def _deduplicate_relationships(self, relationships: Iterable[Relationship]) -> List[Relationship]:
+        """関係性の重複除去（人物の順序によらず同じ組み合わせ・関係の種類をまとめる）"""
+        merger = ExtractionMerger(_relationship_key)
+        merger.add_all(relationships)
+        return merger.values()
+    
+    def _cached_extract(self, extraction_type: str, text: str) -> List:
+        """
+        抽出タイプ用のモデルでlx.extractを実行し、抽出結果（Extractionのリスト）を返す
+        プロンプト・抽出例・モデルはインスタンス内で固定のため、同じテキストの結果はLRUキャッシュから返す
+        解析エラーは例外として送出されるため、キャッシュするのは抽出に成功した空でない結果のみ
+        """
+        key = (extraction_type, text)
+        with self._extract_cache_lock:
+            if key in self._extract_cache:
+                self._extract_cache.move_to_end(key)
+                return self._extract_cache[key]
+        
+        # 統合プロンプトはバッチ全体を1回で処理するため、バッファサイズをテキスト長に合わせる
+        max_char_buffer = len(text) if extraction_type == "combined" else 1000
+        result = lx.extract(
+            text_or_documents=text,
+            prompt_description=self.prompts[extraction_type],
+            examples=self.examples[extraction_type],
+            model=self._get_model(extraction_type),
+            use_schema_constraints=False,  # スキーマはモデル生成時に設定済み
+            max_char_buffer=max_char_buffer,
+            # 解析エラーは握りつぶさずに送出し、呼び出し元で分割・種類別の抽出に戻す
+            resolver_params={"suppress_parse_errors": False},
+            show_progress=False
+        )
+        
+        if result.extractions:
+            with self._extract_cache_lock:
+                self._extract_cache[key] = result.extractions
+                if len(self._extract_cache) > _EXTRACT_CACHE_SIZE:
+                    self._extract_cache.popitem(last=False)
+        return result.extractions
+    
+    def _combined_extract(self, chunks: List[str]) -> Dict[str, List]:
+        """
+        複数チャンクを1つのプロンプトにまとめ、3種類の情報を一度に抽出
+        バッファサイズを結合後のテキスト長に合わせ、LangExtract内部で再分割されないようにする
+        Args:
+            chunks: チャンクのリスト
+        Returns:
+            抽出結果の辞書
+        """
+        batch_text = "\n\n".join(chunks)
+        extractions = self._cached_extract("combined", batch_text)
+        
+        # extraction_classごとに振り分けてデータクラスに変換
+        grouped = {"character": [], "emotion": [], "relationship": []}
+        for extraction in extractions:
+            if extraction.extraction_class in grouped:
+                grouped[extraction.extraction_class].append(extraction)
+        return {
+            "characters": self._convert_extractions("character", grouped["character"]),
+            "emotions": self._convert_extractions("emotion", grouped["emotion"]),
+            "relationships": self._convert_extractions("relationship", grouped["relationship"])
+        }
+    
+    def _convert_extractions(self, extraction_type: str, extractions: List) -> List:
+        """LangExtractの抽出結果を適切なデータクラスに変換"""
+        if extraction_type == "character":
+            items = []
+            for extraction in extractions:
                 attrs = extraction.attributes
                 char = Character(
                     name=extraction.extraction_text or attrs.get("name", "不明"),
@@ -347,42 +901,11 @@ class JapaneseTextExtractor:
                     appearance=attrs.get("appearance"),
                     personality=attrs.get("personality")
                 )
-                characters.append(char)
-            
-            return characters
-            
-        except json.JSONDecodeError as e:
-            print(f"    ⚠️ JSON解析エラー: テキストサイズを縮小してリトライします")
-            # より小さなチャンクで再試行
-            if len(text) > 1000:
-                smaller_chunks = self._chunk_text(text, 1000)
-                all_chars = []
-                for chunk in smaller_chunks[:3]:  # 最初の3チャンクのみ
-                    try:
-                        chunk_chars = self._safe_extract_characters(chunk)
-                        all_chars.extend(chunk_chars)
-                    except:
-                        continue
-                return all_chars
-            return []
-        except Exception as e:
-            print(f"    ❌ エラー: {e}")
-            return []
-    
-    def _safe_extract_emotions(self, text: str) -> List[Emotion]:
-        """安全な感情抽出（エラーハンドリング付き）"""
-        try:
-            import json
-            result = lx.extract(
-                text_or_documents=text,
-                prompt_description=self.prompts["emotion"],
-                examples=self.examples["emotion"],
-                model_id=self.model_id,
-                api_key=self.api_key
-            )
-            
-            emotions = []
-            for extraction in result.extractions:
+                items.append(char)
+        
+        elif extraction_type == "emotion":
+            items = []
+            for extraction in extractions:
                 attrs = extraction.attributes
                 emotion = Emotion(
                     emotion_type=attrs.get("emotion_type", "不明"),
@@ -391,41 +914,11 @@ class JapaneseTextExtractor:
                     intensity=attrs.get("intensity", "普通"),
                     quote=extraction.extraction_text or attrs.get("quote", "")
                 )
-                emotions.append(emotion)
-            
-            return emotions
-            
-        except json.JSONDecodeError as e:
-            print(f"    ⚠️ JSON解析エラー: テキストサイズを縮小してリトライします")
-            if len(text) > 1000:
-                smaller_chunks = self._chunk_text(text, 1000)
-                all_emotions = []
-                for chunk in smaller_chunks[:3]:
-                    try:
-                        chunk_emotions = self._safe_extract_emotions(chunk)
-                        all_emotions.extend(chunk_emotions)
-                    except:
-                        continue
-                return all_emotions
-            return []
-        except Exception as e:
-            print(f"    ❌ エラー: {e}")
-            return []
-    
-    def _safe_extract_relationships(self, text: str) -> List[Relationship]:
-        """安全な関係性抽出（エラーハンドリング付き）"""
-        try:
-            import json
-            result = lx.extract(
-                text_or_documents=text,
-                prompt_description=self.prompts["relationship"],
-                examples=self.examples["relationship"],
-                model_id=self.model_id,
-                api_key=self.api_key
-            )
-            
-            relationships = []
-            for extraction in result.extractions:
+                items.append(emotion)
+        
+        elif extraction_type == "relationship":
+            items = []
+            for extraction in extractions:
                 attrs = extraction.attributes
                 rel = Relationship(
                     person1=attrs.get("person1", "不明"),
@@ -434,69 +927,27 @@ class JapaneseTextExtractor:
                     direction=attrs.get("direction", "一方向"),
                     evidence=extraction.extraction_text or attrs.get("evidence", "")
                 )
-                relationships.append(rel)
-            
-            return relationships
-            
-        except json.JSONDecodeError as e:
-            print(f"    ⚠️ JSON解析エラー: テキストサイズを縮小してリトライします")
-            if len(text) > 1000:
-                smaller_chunks = self._chunk_text(text, 1000)
-                all_rels = []
-                for chunk in smaller_chunks[:3]:
-                    try:
-                        chunk_rels = self._safe_extract_relationships(chunk)
-                        all_rels.extend(chunk_rels)
-                    except:
-                        continue
-                return all_rels
-            return []
-        except Exception as e:
-            print(f"    ❌ エラー: {e}")
-            return []
-    
-    def _deduplicate_characters(self, characters: List[Character]) -> List[Character]:
-        """登場人物の重複除去"""
-        seen_names = set()
-        unique_chars = []
-        
-        for char in characters:
-            # 名前の正規化（空白除去、小文字化）
-            normalized_name = char.name.replace(" ", "").replace("　", "").lower()
-            if normalized_name not in seen_names:
-                seen_names.add(normalized_name)
-                unique_chars.append(char)
-        
-        return unique_chars
-    
-    def _deduplicate_relationships(self, relationships: List[Relationship]) -> List[Relationship]:
-        """関係性の重複除去"""
-        seen_rels = set()
-        unique_rels = []
+                items.append(rel)
         
-        for rel in relationships:
-            # 関係性の正規化
-            rel_key = f"{rel.person1}_{rel.person2}_{rel.relation_type}"
-            if rel_key not in seen_rels:
-                seen_rels.add(rel_key)
-                unique_rels.append(rel)
+        else:
+            items = []
         
-        return unique_rels
+        return items
     
-    def _extract_with_scaling(self, text: str, extraction_type: str, extraction_passes: int, 
-                             max_workers: int, max_char_buffer: int) -> List:
+    def _extract_with_scaling(self, text: str, extraction_type: str, extraction_passes: int,
+                             max_char_buffer: int) -> List:
         """
         LangExtractのScaling機能を使用した抽出
+        生成済みのモデルを使い回すため、1回の抽出内の並列数はモデル側の設定（プロバイダーの既定値）に従う
         Args:
             text: 入力テキスト
             extraction_type: 抽出タイプ (character, emotion, relationship)
             extraction_passes: 抽出パス数
-            max_workers: 並列処理ワーカー数
             max_char_buffer: コンテキストバッファサイズ
         Returns:
             抽出結果のリスト
         """
-        print(f"  📡 {extraction_type}をScaling機能で抽出中...")
+        logger.debug("📡 %sをScaling機能で抽出中...", extraction_type)
         
         try:
             # LangExtractのScaling機能を使用
@@ -504,174 +955,19 @@ class JapaneseTextExtractor:
                 text_or_documents=text,
                 prompt_description=self.prompts[extraction_type],
                 examples=self.examples[extraction_type],
-                model_id=self.model_id,
-                api_key=self.api_key,
+                model=self._get_model(extraction_type),
+                use_schema_constraints=False,  # スキーマはモデル生成時に設定済み
                 # Scaling parameters
                 extraction_passes=extraction_passes,  # 複数パスで精度向上
-                max_workers=max_workers,             # 並列処理
                 max_char_buffer=max_char_buffer      # 小さなバッファで精度向上
             )
             
             # 結果を適切なデータクラスに変換
-            if extraction_type == "character":
-                items = []
-                for extraction in result.extractions:
-                    attrs = extraction.attributes
-                    char = Character(
-                        name=extraction.extraction_text or attrs.get("name", "不明"),
-                        gender=attrs.get("gender", "不明"),
-                        age=attrs.get("age"),
-                        occupation=attrs.get("occupation"),
-                        appearance=attrs.get("appearance"),
-                        personality=attrs.get("personality")
-                    )
-                    items.append(char)
-            
-            elif extraction_type == "emotion":
-                items = []
-                for extraction in result.extractions:
-                    attrs = extraction.attributes
-                    emotion = Emotion(
-                        emotion_type=attrs.get("emotion_type", "不明"),
-                        subject=attrs.get("subject", "不明"),
-                        target=attrs.get("target"),
-                        intensity=attrs.get("intensity", "普通"),
-                        quote=extraction.extraction_text or attrs.get("quote", "")
-                    )
-                    items.append(emotion)
-            
-            elif extraction_type == "relationship":
-                items = []
-                for extraction in result.extractions:
-                    attrs = extraction.attributes
-                    rel = Relationship(
-                        person1=attrs.get("person1", "不明"),
-                        person2=attrs.get("person2", "不明"),
-                        relation_type=attrs.get("relation_type", "不明"),
-                        direction=attrs.get("direction", "一方向"),
-                        evidence=extraction.extraction_text or attrs.get("evidence", "")
-                    )
-                    items.append(rel)
-            
-            else:
-                items = []
+            items = self._convert_extractions(extraction_type, result.extractions)
             
-            print(f"    → Scaling機能で{len(items)}個の{extraction_type}を発見")
+            logger.debug("→ Scaling機能で%d個の%sを発見", len(items), extraction_type)
             return items
             
         except Exception as e:
-            print(f"    ❌ Scaling機能でエラー: {e}")
+            logger.debug("❌ Scaling機能でエラー: %s", e)
             raise e
-    
-    # プロンプトテンプレート
-    def _get_character_prompt(self) -> str:
-        return """
-あなたは日本文学の専門家です。以下の小説から登場人物を抽出してください。
-
-抽出する情報:
-- name: 人物名（フルネーム、愛称、呼び名すべて）
-- gender: 性別（男性/女性/不明）
-- age: 年齢（明記されていれば数値、なければ推定：子供/若者/中年/老人）
-- occupation: 職業・身分
-- appearance: 外見的特徴
-- personality: 性格・人柄（具体的な描写から推測）
-
-注意事項:
-- 「私」「僕」などの一人称も人物として扱う
-- 同一人物の異なる呼び名は統合する
-- 推測の場合は必ず「推定」と明記する
-"""
-    
-    def _get_emotion_prompt(self) -> str:
-        return """
-テキストから感情表現を抽出してください。
-
-抽出する情報:
-- emotion_type: 感情の種類（喜び、悲しみ、怒り、恐れ、驚き、嫌悪、期待、信頼など）
-- subject: 感情の主体（誰の感情か）
-- target: 感情の対象（何に対する感情か）
-- intensity: 感情の強度（弱い/普通/強い）
-- quote: 原文の該当箇所（正確に引用）
-
-日本語特有の表現に注意:
-- 間接的な感情表現（「〜そうだ」「〜らしい」）
-- 擬態語・擬音語による感情表現
-- 文末表現による感情のニュアンス
-"""
-    
-    def _get_relationship_prompt(self) -> str:
-        return """
-登場人物間の関係性を抽出してください。
-
-抽出する情報:
-- person1: 人物1の名前
-- person2: 人物2の名前
-- relation_type: 関係の種類（家族/友人/恋人/上司部下/師弟/敵対など）
-- direction: 関係の方向性（一方向/双方向）
-- evidence: 関係性の根拠となる文章の引用
-
-関係性の種類の例:
-- 家族関係（親子、兄弟、夫婦など）
-- 社会的関係（上司部下、師弟、同僚など）
-- 個人的関係（友人、恋人、敵対など）
-"""
-    
-    # 抽出例の定義
-    def _get_character_examples(self) -> List:
-        return [
-            lx.data.ExampleData(
-                text="私は猫である。名前はまだ無い。",
-                extractions=[
-                    lx.data.Extraction(
-                        extraction_class="character",
-                        extraction_text="私",
-                        attributes={
-                            "name": "私（猫）",
-                            "gender": "不明",
-                            "age": "不明",
-                            "occupation": "なし（猫）",
-                            "appearance": "猫",
-                            "personality": "観察力が鋭い、哲学的"
-                        }
-                    )
-                ]
-            )
-        ]
-    
-    def _get_emotion_examples(self) -> List:
-        return [
-            lx.data.ExampleData(
-                text="メロスは激怒した。必ず、かの邪智暴虐の王を除かなければならぬと決意した。",
-                extractions=[
-                    lx.data.Extraction(
-                        extraction_class="emotion",
-                        extraction_text="メロスは激怒した",
-                        attributes={
-                            "emotion_type": "怒り",
-                            "subject": "メロス",
-                            "target": "王",
-                            "intensity": "強い"
-                        }
-                    )
-                ]
-            )
-        ]
-    
-    def _get_relationship_examples(self) -> List:
-        return [
-            lx.data.ExampleData(
-                text="メロスには妹がいる。十六歳で、村の牧人と婚約していた。",
-                extractions=[
-                    lx.data.Extraction(
-                        extraction_class="relationship",
-                        extraction_text="メロスには妹がいる",
-                        attributes={
-                            "person1": "メロス",
-                            "person2": "妹",
-                            "relation_type": "兄妹",
-                            "direction": "双方向"
-                        }
-                    )
-                ]
-            )
-        ]
\ No newline at end of file
@@ -0,0 +1,142 @@
+import asyncio
+import re
+from pathlib import Path
+
+import pytest
+import requests
+
+from src.aozora_fetcher import AozoraFetcher, TextNormalizer
+
+
+def test_normalize_removes_ruby() -> None:
+    normalizer = TextNormalizer()
+    text = "｜羅生門《らしょうもん》の下で下人《げにん》が雨やみを待っていた。"
+    assert normalizer.normalize(text) == "羅生門の下で下人が雨やみを待っていた。"
+
+
+def test_normalize_removes_annotations() -> None:
+    normalizer = TextNormalizer()
+    text = "下人が［＃「下人」に傍点］いた。※［＃「木＋安」、第3水準1-85-87］［＃ルビの注記］"
+    assert normalizer.normalize(text) == "下人がいた。"
+
+
+def test_normalize_matches_sequential_markup_substitutions() -> None:
+    # 正規化の高速化前と同じく、ルビ→注釈の順に1パターンずつ置換した結果と比較する
+    patterns = [
+        (r"｜([^《]+)《[^》]+》", r"\1"),
+        (r"([一-龥々ぁ-ゔァ-ヴー]+)《[^》]+》", r"\1"),
+        (r"［＃[^］]*ルビ[^］]*］", ""),
+        (r"［＃[^］]+］", ""),
+    ]
+
+    def sequential(text: str) -> str:
+        for pattern, replacement in patterns:
+            text = re.sub(pattern, replacement, text)
+        return text
+
+    normalizer = TextNormalizer()
+    for text in (
+        "｜漢［＃注］字《かんじ》",
+        "漢字《かん［＃注］じ》の下",
+        "下人《げにん》［＃「下人」に傍点］が｜羅生門［＃ルビの注記］《らしょうもん》にいた",
+        "｜［＃注］《よみ》と漢字《［＃注］》",
+    ):
+        assert normalizer.normalize(text) == sequential(text)
+    assert normalizer.normalize("｜漢［＃注］字《かんじ》") == "漢字"
+
+
+def test_normalize_collapses_whitespace() -> None:
+    normalizer = TextNormalizer()
+    text = "ある日の暮方の事　　である。\r\n\r\n\r\n\r\n一人の  下人が\n\n\n\n待っていた。"
+    expected = "ある日の暮方の事　である。\n\n一人の 下人が\n\n待っていた。"
+    assert normalizer.normalize(text) == expected
+
+
+def test_normalize_strips_header_and_footer() -> None:
+    normalizer = TextNormalizer()
+    text = (
+        "羅生門\n芥川龍之介\n-------------------------------------------------------\n"
+        "ある日の暮方の事である。\n一人の下人が、羅生門の下で雨やみを待っていた。\n"
+        "底本：「芥川龍之介全集1」ちくま文庫、筑摩書房\n"
+    )
+    expected = "ある日の暮方の事である。\n一人の下人が、羅生門の下で雨やみを待っていた。"
+    assert normalizer.normalize(text) == expected
+
+
+def test_fetch_sample_uses_disk_cache(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    fetcher = AozoraFetcher(cache_dir=str(tmp_path))
+    monkeypatch.setattr(fetcher, "fetch_from_url", lambda url: "｜羅生門《らしょうもん》の下")
+
+    assert fetcher.fetch_sample("羅生門") == "羅生門の下"
+    assert len(list(tmp_path.glob("*.txt"))) == 1
+
+    def fail(url: str) -> str:
+        raise AssertionError("キャッシュがあるのに再取得された")
+
+    monkeypatch.setattr(fetcher, "fetch_from_url", fail)
+    assert fetcher.fetch_sample("羅生門") == "羅生門の下"
+
+
+def test_fetch_sample_does_not_cache_error_pages(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    fetcher = AozoraFetcher(cache_dir=str(tmp_path))
+    response = requests.Response()
+    response.status_code = 404
+    response._content = "<html><body>ページが見つかりません</body></html>".encode("shift_jis")
+    monkeypatch.setattr(fetcher.session, "get", lambda url, timeout: response)
+
+    assert fetcher.fetch_sample("羅生門") == ""
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_cache_path_changes_with_normalizer_version(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    fetcher = AozoraFetcher(cache_dir=str(tmp_path))
+    url = AozoraFetcher.SAMPLE_WORKS["羅生門"]["url"]
+    fetcher._write_cache(url, "羅生門の下")
+    assert fetcher._read_cache(url) == "羅生門の下"
+    assert [path.suffix for path in tmp_path.iterdir()] == [".txt"]
+
+    monkeypatch.setattr(TextNormalizer, "VERSION", TextNormalizer.VERSION + 1)
+    assert fetcher._read_cache(url) is None
+
+
+def test_fetch_many_keeps_order_and_isolates_failures(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    from aiohttp import web
+    from aiohttp.test_utils import TestServer
+    from aiohttp.typedefs import Handler
+
+    def respond(body: str, status: int = 200, delay: float = 0.0) -> Handler:
+        async def handler(request: web.Request) -> web.Response:
+            await asyncio.sleep(delay)
+            return web.Response(status=status, body=body.encode("shift_jis"))
+
+        return handler
+
+    # 最初の作品の応答を遅らせ、完了順ではなく入力順で返ることを確認する
+    routes = {
+        "/slow": respond('<div class="main_text">｜羅生門《らしょうもん》の下</div>', delay=0.05),
+        "/broken": respond("Service Unavailable", status=503),
+        "/fast": respond('<div class="main_text">走れメロス</div>'),
+    }
+
+    async def run() -> list[str]:
+        app = web.Application()
+        for path, handler in routes.items():
+            app.router.add_get(path, handler)
+        async with TestServer(app) as server:
+            fetcher = AozoraFetcher(cache_dir=str(tmp_path))
+            paths = {"羅生門": "/slow", "坊っちゃん": "/broken", "走れメロス": "/fast"}
+            works = {
+                name: {"author": "", "url": str(server.make_url(path))}
+                for name, path in paths.items()
+            }
+            monkeypatch.setattr(fetcher, "SAMPLE_WORKS", works)
+            return await fetcher.fetch_many(["羅生門", "坊っちゃん", "走れメロス"])
+
+    assert asyncio.run(run()) == ["羅生門の下", "", "走れメロス"]
+    assert len(list(tmp_path.glob("*.txt"))) == 2
@@ -0,0 +1,89 @@
+import csv
+import json
+from pathlib import Path
+
+from src.result_analyzer import ResultAnalyzer
+from src.text_extractor import Character, Emotion, Relationship
+
+
+def _sample_results() -> dict:
+    return {
+        "characters": [
+            Character("下人", "男性", "若者", "下人", None, "迷いがある"),
+            Character("老婆", "女性", "老人", None, "白髪", None),
+            Character("下人", "男性", None, None, None, None),
+        ],
+        "emotions": [
+            Emotion("恐れ", "下人", "老婆", "強い", "下人は六分の恐怖と四分の好奇心とに動かされて"),
+            Emotion("怒り", "下人", "老婆", "強い", "老婆に対するはげしい憎悪が"),
+            Emotion("恐れ", "老婆", "下人", "普通", "老婆は、一目下人を見ると"),
+        ],
+        "relationships": [
+            Relationship("下人", "老婆", "敵対", "一方向", "下人は老婆の着物を剥ぎとった"),
+        ],
+    }
+
+
+def test_get_summary_stats() -> None:
+    stats = ResultAnalyzer(_sample_results()).get_summary_stats()
+    assert stats["total_characters"] == 3
+    assert stats["unique_names"] == 2
+    assert stats["total_emotions"] == 3
+    assert stats["emotion_types"] == {"恐れ": 2, "怒り": 1}
+    assert stats["total_relationships"] == 1
+    assert stats["relation_types"] == {"敵対": 1}
+    assert stats["gender_distribution"] == {"男性": 2, "女性": 1}
+    assert stats["characters_with_emotions"] == 2
+
+
+def test_save_results_writes_json_and_csv(tmp_path: Path) -> None:
+    analyzer = ResultAnalyzer(_sample_results())
+    output_path = analyzer.save_results(work_name="羅生門", output_dir=str(tmp_path))
+
+    assert output_path == tmp_path / "羅生門"
+    saved = json.loads((output_path / "extraction_results.json").read_text(encoding="utf-8"))
+    assert saved["work_name"] == "羅生門"
+    assert saved["characters"][1]["appearance"] == "白髪"
+    assert saved["summary"]["unique_names"] == 2
+
+    with open(output_path / "characters.csv", encoding="utf-8", newline="") as f:
+        rows = list(csv.DictReader(f))
+    assert [row["name"] for row in rows] == ["下人", "老婆", "下人"]
+    assert rows[1]["occupation"] == ""
+    assert (output_path / "emotions.csv").exists()
+    assert (output_path / "relationships.csv").exists()
+
+
+def test_save_results_skips_empty_csv(tmp_path: Path) -> None:
+    results = {"characters": [], "emotions": [], "relationships": []}
+    output_path = ResultAnalyzer(results).save_results(work_name="空", output_dir=str(tmp_path))
+
+    assert (output_path / "extraction_results.json").exists()
+    assert not (output_path / "characters.csv").exists()
+
+
+def test_summary_stats_are_cached() -> None:
+    analyzer = ResultAnalyzer(_sample_results())
+    assert analyzer.get_summary_stats() is analyzer.get_summary_stats()
+    assert analyzer.analyze_japanese_specific() is analyzer.analyze_japanese_specific()
+
+
+def test_analyze_japanese_specific() -> None:
+    results = {
+        "characters": [
+            Character("私（猫）", "不明", None, None, "猫", None),
+            Character("主人", "男性", None, "教師", None, None),
+        ],
+        "emotions": [
+            Emotion("喜び", "主人", None, "普通", "主人はうれしそうだ"),
+            Emotion("怒り", "主人", None, "強い", "主人は怒った"),
+        ],
+        "relationships": [
+            Relationship("主人", "書生", "師弟", "一方向", ""),
+            Relationship("私（猫）", "主人", "家族", "一方向", ""),
+        ],
+    }
+    analysis = ResultAnalyzer(results).analyze_japanese_specific()
+    assert analysis["first_person_pronouns"] == ["私（猫）"]
+    assert [e["quote"] for e in analysis["indirect_emotions"]] == ["主人はうれしそうだ"]
+    assert analysis["formal_relationships"] == [{"persons": "主人 - 書生", "type": "師弟"}]
@@ -0,0 +1,218 @@
+import asyncio
+import json
+from collections import Counter
+from collections.abc import Iterator, Sequence
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any
+
+import pytest
+from google.genai import errors
+from langextract.core.base_model import BaseLanguageModel
+from langextract.core.exceptions import InferenceRuntimeError
+from langextract.core.types import ScoredOutput
+from langextract.resolver import ResolverParsingError
+
+from src import text_extractor
+from src.text_extractor import (
+    Character,
+    Emotion,
+    ExtractionMerger,
+    JapaneseTextExtractor,
+    Relationship,
+    _is_retryable_error,
+)
+
+
+class MalformedJsonModel(BaseLanguageModel):
+    def infer(
+        self, batch_prompts: Sequence[str], **kwargs: Any
+    ) -> Iterator[Sequence[ScoredOutput]]:
+        for _ in batch_prompts:
+            yield [ScoredOutput(score=1.0, output='{"extractions": [')]
+
+
+@pytest.fixture
+def extractor(monkeypatch: pytest.MonkeyPatch) -> JapaneseTextExtractor:
+    monkeypatch.setenv("GOOGLE_API_KEY", "dummy")
+    return JapaneseTextExtractor(model_id="gemini-2.0-flash-exp")
+
+
+def test_chunk_text_splits_on_sentence_boundaries(extractor: JapaneseTextExtractor) -> None:
+    text = "下人は雨やみを待っていた。老婆は白髪だった！誰もいない？"
+    chunks = extractor._chunk_text(text, 15)
+    assert chunks == ["下人は雨やみを待っていた。", "老婆は白髪だった。誰もいない。"]
+
+
+def test_chunk_text_keeps_short_text_in_one_chunk(extractor: JapaneseTextExtractor) -> None:
+    assert extractor._chunk_text("短い文。もう一つ。", 100) == ["短い文。もう一つ。"]
+
+
+def test_chunk_text_never_exceeds_max_size(extractor: JapaneseTextExtractor) -> None:
+    text = "下人は雨やみを待っていた。" * 100 + "あ" * 2500
+    chunks = extractor._chunk_text(text, 1000)
+    assert max(len(chunk) for chunk in chunks) <= 1000
+    assert "".join(chunks).replace("。", "") == text.replace("。", "")
+
+
+def test_deduplicate_characters_fills_unknown_fields(extractor: JapaneseTextExtractor) -> None:
+    characters = [
+        Character("下人", "男性", None, "不明", None, None),
+        Character("下 人", "不明", "若者", "下人", None, "迷いがある"),
+        Character("老婆", "女性", "老人", None, "白髪", None),
+    ]
+    unique = extractor._deduplicate_characters(characters)
+    assert unique == [
+        Character("下人", "男性", "若者", "下人", None, "迷いがある"),
+        Character("老婆", "女性", "老人", None, "白髪", None),
+    ]
+
+
+def test_deduplicate_relationships_ignores_person_order(extractor: JapaneseTextExtractor) -> None:
+    relationships = [
+        Relationship("下人", "老婆", "敵対", "一方向", ""),
+        Relationship("老婆", "下人", "敵対", "双方向", "下人は老婆の着物を剥ぎとった"),
+        Relationship("下人", "老婆", "主従", "一方向", "根拠"),
+    ]
+    unique = extractor._deduplicate_relationships(relationships)
+    assert unique == [
+        Relationship("下人", "老婆", "敵対", "一方向", "下人は老婆の着物を剥ぎとった"),
+        Relationship("下人", "老婆", "主従", "一方向", "根拠"),
+    ]
+
+
+def test_extraction_merger_is_independent_of_batch_completion_order(
+    extractor: JapaneseTextExtractor,
+) -> None:
+    batches = [
+        [Character("下人", "男性", None, None, None, None)],
+        [
+            Character("下人", "不明", "若者", None, None, None),
+            Character("老婆", "女性", None, None, None, None),
+        ],
+        [Character("下人", "女性", "老人", "下人", None, None)],
+    ]
+    merger = ExtractionMerger(lambda char: char.name)
+    for i in (2, 0, 1):
+        merger.add_all(batches[i], i)
+    assert merger.values() == extractor._deduplicate_characters(
+        [char for batch in batches for char in batch]
+    )
+    assert merger.values()[0] == Character("下人", "男性", "若者", "下人", None, None)
+
+
+def test_stream_to_jsonl_writes_deduplicated_records(
+    extractor: JapaneseTextExtractor, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    def fake_combined_extract(chunks: list[str]) -> dict:
+        return {
+            "characters": [Character("下人", "男性", None, None, None, None)],
+            "emotions": [Emotion("恐れ", "下人", "老婆", "強い", chunks[0][:5])],
+            "relationships": [Relationship("下人", "老婆", "敵対", "一方向", "")],
+        }
+
+    monkeypatch.setattr(extractor, "_combined_extract", fake_combined_extract)
+    output_path = tmp_path / "out.jsonl"
+    text = "下人は雨やみを待っていた。" * 10
+
+    asyncio.run(extractor.stream_to_jsonl(text, str(output_path), max_chunk_size=26, batch_size=2))
+
+    records = [json.loads(line) for line in output_path.read_text(encoding="utf-8").splitlines()]
+    counts = Counter(record["type"] for record in records)
+    assert counts == {"characters": 1, "emotions": 3, "relationships": 1}
+
+
+def test_is_retryable_error_checks_wrapped_status_code() -> None:
+    rate_limited = errors.ClientError(
+        429, {"error": {"code": 429, "message": "Quota exceeded", "status": "RESOURCE_EXHAUSTED"}}
+    )
+    assert _is_retryable_error(InferenceRuntimeError("Gemini API error", original=rate_limited))
+    assert _is_retryable_error(TimeoutError())
+
+    bad_request = errors.ClientError(
+        400,
+        {"error": {"code": 400, "message": "line 429 is invalid", "status": "INVALID_ARGUMENT"}},
+    )
+    assert not _is_retryable_error(InferenceRuntimeError("Gemini API error", original=bad_request))
+    assert not _is_retryable_error(ValueError("429"))
+
+
+def test_cached_extract_reuses_result_for_same_text(
+    extractor: JapaneseTextExtractor, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    calls = []
+
+    def fake_extract(**kwargs: Any) -> SimpleNamespace:
+        text = kwargs["text_or_documents"]
+        calls.append(text)
+        return SimpleNamespace(extractions=[text] if text else [])
+
+    monkeypatch.setattr(text_extractor.lx, "extract", fake_extract)
+    monkeypatch.setattr(extractor, "_get_model", lambda extraction_type: None)
+
+    assert extractor._cached_extract("character", "下人") == ["下人"]
+    assert extractor._cached_extract("character", "下人") == ["下人"]
+    assert extractor._cached_extract("emotion", "下人") == ["下人"]
+    assert extractor._cached_extract("character", "") == []
+    assert extractor._cached_extract("character", "") == []
+    assert calls == ["下人", "下人", "", ""]
+
+
+def test_extract_batch_falls_back_to_per_chunk_extraction_on_parse_error(
+    extractor: JapaneseTextExtractor, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    separated = []
+
+    async def fake_extract_separately(text: str) -> dict:
+        await asyncio.sleep(0)
+        separated.append(text)
+        return {
+            "characters": [Character(text, "不明", None, None, None, None)],
+            "emotions": [],
+            "relationships": [],
+        }
+
+    monkeypatch.setattr(extractor, "_get_model", lambda extraction_type: MalformedJsonModel())
+    monkeypatch.setattr(extractor, "_extract_separately_async", fake_extract_separately)
+
+    results = asyncio.run(extractor._extract_batch_async(["下人", "老婆"]))
+
+    assert separated == ["下人", "老婆"]
+    assert [char.name for char in results["characters"]] == ["下人", "老婆"]
+
+
+def test_async_extract_retries_first_three_subchunks_on_parse_error(
+    extractor: JapaneseTextExtractor, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    calls = []
+
+    def fake_extract_items(extraction_type: str, text: str) -> list:
+        calls.append(len(text))
+        if len(text) > 1000:
+            raise ResolverParsingError("Failed to parse JSON content")
+        return [Character("下人", "男性", None, None, None, None)]
+
+    monkeypatch.setattr(extractor, "_extract_items", fake_extract_items)
+    text = "下人は雨やみを待っていた。" * 400
+
+    characters = asyncio.run(extractor._async_extract("character", text))
+
+    assert calls[0] == len(text)
+    assert len(calls) == 4 and all(length <= 1000 for length in calls[1:])
+    assert characters == [Character("下人", "男性", None, None, None, None)] * 3
+
+
+def test_async_extract_splits_only_once_on_parse_error(
+    extractor: JapaneseTextExtractor, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    calls = []
+
+    def fake_extract_items(extraction_type: str, text: str) -> list:
+        calls.append(len(text))
+        raise ResolverParsingError("Failed to parse JSON content")
+
+    monkeypatch.setattr(extractor, "_extract_items", fake_extract_items)
+    text = "下人は雨やみを待っていた。" * 400
+
+    assert asyncio.run(extractor._async_extract("character", text)) == []
+    assert len(calls) == 4